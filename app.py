@@ -1,13 +1,16 @@
+import hashlib
+import io
 import os
 import streamlit as st
-import pandas as pd
 import time
-import pydeck as pdk
-import googlemaps
 import json
 import math
 import re
-import streamlit.components.v1 as components
+
+# pandas, pydeck, googlemaps ו-streamlit.components נטענים רק כשצריך אותם
+# (כ-0.6 שניות) — כך הריצה הראשונה של קונטיינר חדש מציגה את הדף מהר
+
+from itur.ratecontrol import rate_controller
 
 # טעינה אוטומטית של מפתח Google Maps אל ה-Session (ENV/Secrets)
 if not st.session_state.get("google_api_key"):
@@ -25,15 +28,27 @@ if not st.session_state.get("google_api_key"):
 @st.cache_resource
 def get_gmaps_client(api_key):
     """Initializes and returns a Google Maps client."""
+    import googlemaps
+
+    # ITUR_GOOGLE_URL מפנה לשרת אחר (למשל itur fake-provider בבדיקות עומס)
+    base_url = os.environ.get("ITUR_GOOGLE_URL", "").rstrip("/")
     try:
-        return googlemaps.Client(key=api_key)
+        # בלי ניסיונות חוזרים פנימיים על OVER_QUERY_LIMIT — בקר הקצב מטפל בהם
+        return googlemaps.Client(
+            key=api_key, retry_over_query_limit=False, **({"base_url": base_url} if base_url else {})
+        )
     except Exception as e:
         st.error(f"שגיאה באימות מפתח ה-API: {e}")
         return None
 
+# בקר קצב משותף לכל הסשנים בתהליך: מאיץ כל עוד Google עונה, ומאט על OVER_QUERY_LIMIT
+GOOGLE_MAX_RATE = float(os.environ.get("ITUR_GOOGLE_MAX_RATE", "40"))
+_google_rate = rate_controller("google", initial_rate=5.0, max_rate=GOOGLE_MAX_RATE)
+
+
 def geocode_address_google(gmaps, address):
     """Geocodes a single address using Google Maps API."""
-    geocode_result = gmaps.geocode(address, language='iw')
+    geocode_result = _google_rate.call(gmaps.geocode, address, language='iw')
     return geocode_result
 
 
@@ -58,6 +73,37 @@ def _deg_to_dms(value: float, *, is_lat: bool) -> str:
     return (f"{deg:02d}° {minutes:02d}' {seconds:05.2f}\" {sign}" if is_lat
             else f"{deg:03d}° {minutes:02d}' {seconds:05.2f}\" {sign}")
 
+# קצב מרבי לעדכוני שורת ההתקדמות (כל עדכון הוא הודעת websocket לדפדפן)
+PROGRESS_INTERVAL_SECONDS = 0.25
+
+# גבולות למטמוני st.cache_data: המטמון משותף לכל הסשנים בתהליך, ובלי גבול
+# טבלאות, קבצי CSV ו-HTML של מפות נשארים בזיכרון הקונטיינר לכל אורך חייו
+CACHE_MAX_ENTRIES = 32
+CACHE_TTL_SECONDS = 3600
+
+# st.fragment מאפשר להריץ מחדש רק קטע מהדף; בגרסאות ישנות — ריצה רגילה
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda f: f)
+
+
+def _frame_digest(df) -> str:
+    """Hash יציב של טבלת התוצאות, משמש כמפתח למטמוני התוצרים הנגזרים."""
+    import pandas as pd
+
+    h = hashlib.sha1()
+    h.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df.astype(str), index=True).values.tobytes())
+    return h.hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def _read_upload(data: bytes, name: str):
+    """קריאת הקובץ שהועלה — פעם אחת לכל תוכן קובץ, ולא בכל ריצה מחדש."""
+    import pandas as pd
+
+    buf = io.BytesIO(data)
+    return pd.read_csv(buf) if name.endswith('.csv') else pd.read_excel(buf)
+
+
 # --- פונקציה לעיבוד הנתונים ---
 def geocode_dataframe(df):
     """
@@ -85,6 +131,7 @@ def geocode_dataframe(df):
     # יצירת שורת ההתקדמות
     progress_bar = st.progress(0, text="מתחיל עיבוד...")
     total_rows = len(df)
+    last_progress = 0.0
 
     # לולאה על כל כתובת עם הצגת התקדמות
     for i, address in enumerate(df['Address']):
@@ -112,9 +159,12 @@ def geocode_dataframe(df):
         statuses.append(status)
         found_addresses.append(found_address)
 
-        # עדכון שורת ההתקדמות
-        progress_text = f"מעבד כתובת {i + 1} מתוך {total_rows}: {address}"
-        progress_bar.progress((i + 1) / total_rows, text=progress_text)
+        # עדכון שורת ההתקדמות — לכל היותר פעם ב-PROGRESS_INTERVAL_SECONDS
+        now = time.monotonic()
+        if now - last_progress >= PROGRESS_INTERVAL_SECONDS or i + 1 == total_rows:
+            last_progress = now
+            progress_text = f"מעבד כתובת {i + 1} מתוך {total_rows}: {address}"
+            progress_bar.progress((i + 1) / total_rows, text=progress_text)
 
     progress_bar.empty()  # הסתרת שורת ההתקדמות בסיום
     df['Latitude'] = latitudes
@@ -131,6 +181,204 @@ def geocode_dataframe(df):
         pass
     return df
 
+# --- תוצרים נגזרים מטבלת התוצאות ---
+# כל הפונקציות מקבלות digest של התוצאה כמפתח מטמון; הטבלה עצמה מועברת
+# בפרמטר עם קו תחתון כדי ש-Streamlit לא יחשב לה hash בכל ריצה מחדש.
+
+_STREET_NUMBER_RE = re.compile(r"^(.*?)(?:\s+(\d+))?$")
+_ABBREVIATIONS = [
+    (re.compile(fr"\b{k}\b"), v)
+    for k, v in {"רחוב": "רח'", "שדרות": "שד'", "שדרה": "שד'", "דרך": "ד'", "כיכר": "כ'"}.items()
+]
+_DDM_RE = re.compile(r"(\d+)[°º]\s*([0-9.]+)'\s*([NSEW])")
+_DMS_RE = re.compile(r"(\d+)[°º]\s*(\d+)'\s*([0-9.]+)\"\s*([NSEW])")
+
+
+def _common_address_mistakes(addr: str) -> list[str]:
+    a = (addr or "").strip()
+    if not a:
+        return []
+    parts = [p.strip() for p in a.split(',') if p.strip()]
+    street_part = parts[0] if parts else a
+    city = parts[-1] if len(parts) > 1 else ""
+    m = _STREET_NUMBER_RE.match(street_part)
+    street = m.group(1).strip() if m else street_part
+    number = m.group(2) if m and m.group(2) else ""
+    variants: list[str] = []
+    def add(s: str):
+        s2 = s.strip()
+        if s2 and s2 not in variants:
+            variants.append(s2)
+    # בלי מספר
+    if city:
+        add(f"{street}, {city}")
+    add(street)
+    # החלפת סדר
+    if city and number:
+        add(f"{city}, {street} {number}")
+        add(f"{street} {number} {city}")
+    elif city:
+        add(f"{city}, {street}")
+    # רק עיר
+    if city:
+        add(city)
+    # קיצורים נפוצים
+    s_short = street
+    for pattern, v in _ABBREVIATIONS:
+        s_short = pattern.sub(v, s_short)
+    if s_short != street:
+        if city and number:
+            add(f"{s_short} {number}, {city}")
+        elif city:
+            add(f"{s_short}, {city}")
+        else:
+            add(s_short)
+    # מקף לפני מספר
+    if number:
+        if city:
+            add(f"{street}-{number}, {city}")
+        add(f"{street}-{number}")
+    return variants[:10]
+
+
+def _parse_ddm(s: str) -> float | None:
+    m = _DDM_RE.search(str(s) if s else "")
+    if not m:
+        return None
+    deg = int(m.group(1)); minutes = float(m.group(2)); hemi = m.group(3)
+    val = deg + minutes / 60.0
+    if hemi in ('S','W'):
+        val = -val
+    return val
+
+
+def _parse_dms(s: str) -> float | None:
+    m = _DMS_RE.search(str(s) if s else "")
+    if not m:
+        return None
+    deg = int(m.group(1)); minutes = int(m.group(2)); seconds = float(m.group(3)); hemi = m.group(4)
+    val = deg + minutes / 60.0 + seconds / 3600.0
+    if hemi in ('S','W'):
+        val = -val
+    return val
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def _cached_variants(digest: str, _df, limit: int = 50) -> list[dict]:
+    """וריאציות כתיב לכל אחת מ-limit השורות הראשונות."""
+    out = []
+    for name, row in _df.head(limit).iterrows():
+        addr = str(row.get('Found Address') or row.get('Address') or '')
+        if not addr:
+            continue
+        out.append({
+            "key": str(name),
+            "address": addr,
+            "lat": row.get('Latitude'),
+            "lon": row.get('Longitude'),
+            "variants": _common_address_mistakes(addr),
+        })
+    return out
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def _cached_map_points(digest: str, _df) -> list[dict]:
+    """נקודות למפה: אדום ברירת מחדל; אם DDM ו-DMS שונים (בגלל עיגול) מוסיפים ירוק."""
+    def _close(a, b, tol=1e-6):
+        return (a is None) or (b is None) or abs(a-b) <= tol
+
+    map_data = _df.dropna(subset=['Latitude', 'Longitude'])
+    py_points = []
+    for row in map_data.to_dict('records'):
+        title = str(row.get("Found Address") or row.get("Address") or "")
+        lat = float(row["Latitude"]); lon = float(row["Longitude"])
+        ddm_lat = _parse_ddm(row.get("lat_ddm", "")); ddm_lon = _parse_ddm(row.get("lon_ddm", ""))
+        dms_lat = _parse_dms(row.get("lat_dms", "")); dms_lon = _parse_dms(row.get("lon_dms", ""))
+        if ddm_lat is not None and ddm_lon is not None and dms_lat is not None and dms_lon is not None and (not _close(ddm_lat, dms_lat) or not _close(ddm_lon, dms_lon)):
+            py_points.append({"lat": ddm_lat, "lng": ddm_lon, "title": f"{title} (DDM)", "color": "red"})
+            py_points.append({"lat": dms_lat, "lng": dms_lon, "title": f"{title} (DMS)", "color": "green"})
+        else:
+            py_points.append({"lat": lat, "lng": lon, "title": title, "color": "red"})
+    return py_points
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def _cached_map_html(digest: str, api_key_map: str, _df) -> str:
+    py_points = _cached_map_points(digest, _df)
+    center = py_points[0] if py_points else {"lat": 32.08, "lng": 34.78}
+    return f"""
+<!doctype html>
+<html><head><meta charset=\"utf-8\" />
+<style>html,body,#map{{height:100%;margin:0;padding:0}} .note{{font:14px Arial;padding:8px}}</style>
+<script>
+  const POINTS = {json.dumps(py_points)};
+  function initMap() {{
+    const map = new google.maps.Map(document.getElementById('map'), {{
+      center: {{lat: {center['lat']}, lng: {center['lng']}}},
+      zoom: 12,
+      mapTypeId: 'roadmap'
+    }});
+    for (const p of POINTS) {{
+      new google.maps.Marker({{
+        position: {{lat: p.lat, lng: p.lng}},
+        map: map,
+        title: p.title,
+        icon: p.color === 'green' ? 'http://maps.google.com/mapfiles/ms/icons/green-dot.png' : 'http://maps.google.com/mapfiles/ms/icons/red-dot.png'
+      }});
+    }}
+  }}
+  // אם הספרייה לא עולה, נציג הודעה ידידותית אחרי טיים-אאוט קצר
+  setTimeout(function(){{
+    if (!(window.google && google.maps)) {{
+      document.getElementById('map').innerHTML = '<div class="note">בעיה בטעינת Google Maps. בדוק API Key, Billing והגבלות referrer (localhost/127.0.0.1).</div>';
+    }}
+  }}, 2500);
+</script>
+<script async defer src=\"https://maps.googleapis.com/maps/api/js?key={api_key_map}&callback=initMap\"></script>
+</head>
+<body>
+  <div id=\"map\" style=\"height:600px\"></div>
+</body></html>
+"""
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def _cached_csv_bytes(digest: str, _df) -> bytes:
+    return _df.to_csv(index=False).encode('utf-8-sig')
+
+
+@_fragment
+def _render_address_mistakes(item: dict) -> None:
+    """expander של כתובת אחת; לחיצה על "אמת" מריצה מחדש רק את הקטע הזה."""
+    with st.expander(f"טעויות אפשריות: {item['address']}"):
+        original_lat = item['lat']
+        original_lon = item['lon']
+        ms = item['variants']
+        if ms:
+            for i, mistake in enumerate(ms):
+                cols = st.columns([0.7, 0.3])
+                cols[0].code(mistake, language=None)
+                if cols[1].button("אמת", key=f"val_{item['key']}_{i}"):
+                    api_key = st.session_state.get("google_api_key")
+                    if not api_key:
+                        st.warning("יש להזין מפתח API כדי לאמת.")
+                    else:
+                        gmaps = get_gmaps_client(api_key)
+                        with st.spinner(f"מאמת את '{mistake}'..."):
+                            result = geocode_address_google(gmaps, mistake)
+                            if result and original_lat is not None:
+                                res_lat = result[0]['geometry']['location']['lat']
+                                res_lon = result[0]['geometry']['location']['lng']
+                                if math.isclose(res_lat, original_lat, rel_tol=1e-4) and math.isclose(res_lon, original_lon, rel_tol=1e-4):
+                                    st.success(f"אימות הצליח! הנ.צ. זהה.")
+                                else:
+                                    st.error(f"אימות נכשל. נמצא נ.צ. שונה: ({res_lat:.4f}, {res_lon:.4f})")
+                            else:
+                                st.error("הכתובת לא נמצאה.")
+        else:
+            st.caption("לא נמצאו וריאציות להצעה")
+
+
 # --- בניית הממשק הגרפי ---
 st.set_page_config(layout="wide", page_title="כלי להצמדת נ.צ.")
 
@@ -270,7 +518,7 @@ if input_method == "העלאת קובץ":
     uploaded_file = st.file_uploader("בחר קובץ", type=['csv', 'xlsx'])
     if uploaded_file is not None:
         try:
-            df = pd.read_csv(uploaded_file) if uploaded_file.name.endswith('.csv') else pd.read_excel(uploaded_file)
+            df = _read_upload(uploaded_file.getvalue(), uploaded_file.name)
             st.write("תצוגה מקדימה של 5 השורות הראשונות:", df.head())
         except Exception as e:
             st.error(f"שגיאה בקריאת הקובץ: {e}")
@@ -282,11 +530,15 @@ elif input_method == "הדבקת טקסט":
         # המרת הטקסט לרשימת כתובות ויצירת DataFrame
         addresses = [line.strip() for line in text_input.split('\n') if line.strip()]
         if addresses:
+            import pandas as pd
+
             df = pd.DataFrame(addresses, columns=['Address'])
             st.write("תצוגה מקדימה של הכתובות שהוזנו:", df.head())
 
 elif input_method == "סט בדיקה":
     st.info("נעשה שימוש בסט בדיקה קבוע המכיל כתובות תקינות ושגויות.")
+    import pandas as pd
+
     df = pd.DataFrame(PREDEFINED_TEST_SET, columns=['Address'])
     st.write("תצוגה מקדימה של סט הבדיקה:", df.head())
 
@@ -301,178 +553,30 @@ if 'df_to_process' in st.session_state and not st.session_state['df_to_process']
             # שמירת התוצאות במצב הסשן
             st.session_state['result_df'] = geocode_dataframe(st.session_state['df_to_process'].copy())
             if st.session_state['result_df'] is not None:
+                st.session_state['result_digest'] = _frame_digest(st.session_state['result_df'])
                 st.balloons()
 
 # הצגת התוצאות אם הן קיימות במצב הסשן
 if 'result_df' in st.session_state and st.session_state['result_df'] is not None:
     st.success("העיבוד הסתיים בהצלחה!")
     result_df = st.session_state['result_df']
+    result_digest = st.session_state.get('result_digest') or _frame_digest(result_df)
     st.dataframe(result_df)
 
-    # טעויות כתיבה נפוצות לכל כתובת (ברשימה נפתחת)
-    def _common_address_mistakes(addr: str) -> list[str]:
-        a = (addr or "").strip()
-        if not a:
-            return []
-        parts = [p.strip() for p in a.split(',') if p.strip()]
-        street_part = parts[0] if parts else a
-        city = parts[-1] if len(parts) > 1 else ""
-        m = re.match(r"^(.*?)(?:\s+(\d+))?$", street_part)
-        street = m.group(1).strip() if m else street_part
-        number = m.group(2) if m and m.group(2) else ""
-        variants: list[str] = []
-        def add(s: str):
-            s2 = s.strip()
-            if s2 and s2 not in variants:
-                variants.append(s2)
-        # בלי מספר
-        if city:
-            add(f"{street}, {city}")
-        add(street)
-        # החלפת סדר
-        if city and number:
-            add(f"{city}, {street} {number}")
-            add(f"{street} {number} {city}")
-        elif city:
-            add(f"{city}, {street}")
-        # רק עיר
-        if city:
-            add(city)
-        # קיצורים נפוצים
-        rep = {"רחוב": "רח'", "שדרות": "שד'", "שדרה": "שד'", "דרך": "ד'", "כיכר": "כ'"}
-        s_short = street
-        for k, v in rep.items():
-            s_short = re.sub(fr"\b{k}\b", v, s_short)
-        if s_short != street:
-            if city and number:
-                add(f"{s_short} {number}, {city}")
-            elif city:
-                add(f"{s_short}, {city}")
-            else:
-                add(s_short)
-        # מקף לפני מספר
-        if number:
-            if city:
-                add(f"{street}-{number}, {city}")
-            add(f"{street}-{number}")
-        return variants[:10]
-
     # פתיחה פר‑שורה: לכל כתובת expander עצמאי
     st.markdown("**טעויות כתיבה נפוצות — לכל כתובת בנפרד:**")
-    preview = result_df.head(50)
-    for _, row in preview.iterrows():
-        addr = str(row.get('Found Address') or row.get('Address') or '')
-        if not addr:
-            continue
-        with st.expander(f"טעויות אפשריות: {addr}"):
-            original_lat = row.get('Latitude')
-            original_lon = row.get('Longitude')
-            ms = _common_address_mistakes(addr)
-            if ms:
-                for i, mistake in enumerate(ms):
-                    cols = st.columns([0.7, 0.3])
-                    cols[0].code(mistake, language=None)
-                    if cols[1].button("אמת", key=f"val_{row.name}_{i}"):
-                        api_key = st.session_state.get("google_api_key")
-                        if not api_key:
-                            st.warning("יש להזין מפתח API כדי לאמת.")
-                        else:
-                            gmaps = get_gmaps_client(api_key)
-                            with st.spinner(f"מאמת את '{mistake}'..."):
-                                result = geocode_address_google(gmaps, mistake)
-                                if result and original_lat is not None:
-                                    res_lat = result[0]['geometry']['location']['lat']
-                                    res_lon = result[0]['geometry']['location']['lng']
-                                    if math.isclose(res_lat, original_lat, rel_tol=1e-4) and math.isclose(res_lon, original_lon, rel_tol=1e-4):
-                                        st.success(f"אימות הצליח! הנ.צ. זהה.")
-                                    else:
-                                        st.error(f"אימות נכשל. נמצא נ.צ. שונה: ({res_lat:.4f}, {res_lon:.4f})")
-                                else:
-                                    st.error("הכתובת לא נמצאה.")
-            else:
-                st.caption("לא נמצאו וריאציות להצעה")
+    for item in _cached_variants(result_digest, result_df):
+        _render_address_mistakes(item)
 
     # --- הוספת מפה ---
     map_data = result_df.dropna(subset=['Latitude', 'Longitude'])
     if not map_data.empty:
-        # הגדרת נקודת ההתחלה ושאר היעדים
-        start_point = map_data.iloc[0]
-        destinations = map_data.iloc[1:]
-
-        # יצירת קווים מההתחלה לכל יעד
-        route_lines = []
-        if not destinations.empty:
-            for _, dest in destinations.iterrows():
-                route_lines.append({
-                    "start": [start_point['Longitude'], start_point['Latitude']],
-                    "end": [dest['Longitude'], dest['Latitude']],
-                })
-
-        # הגדרת שכבת הנקודות למפה
-        scatterplot_layer = pdk.Layer(
-            "ScatterplotLayer",
-            data=map_data,
-            get_position=['Longitude', 'Latitude'],
-            get_color=[34, 139, 34, 200],  # צבע ירוק
-            get_radius=50,  # רדיוס הנקודות במטרים
-            pickable=True,
-            auto_highlight=True,
-        )
-
-        # הגדרת שכבת הקווים למפה
-        line_layer = pdk.Layer(
-            "LineLayer",
-            data=route_lines,
-            get_source_position="start",
-            get_target_position="end",
-            get_color=[255, 0, 0, 200],  # צבע אדום
-            get_width=3,
-        )
-
-        # העברת רשימה של שתי השכבות למפה
-        # מציג מפה של גוגל עם נקודות בלבד
-        # בניית נקודות: אדום ברירת מחדל; אם DDM ו-DMS שונים (בגלל עיגול) מוסיפים ירוק
-        def _parse_ddm(s: str) -> float | None:
-            m = re.search(r"(\d+)[°º]\s*([0-9.]+)'\s*([NSEW])", str(s) if s else "")
-            if not m:
-                return None
-            deg = int(m.group(1)); minutes = float(m.group(2)); hemi = m.group(3)
-            val = deg + minutes / 60.0
-            if hemi in ('S','W'):
-                val = -val
-            return val
-
-        def _parse_dms(s: str) -> float | None:
-            m = re.search(r"(\d+)[°º]\s*(\d+)'\s*([0-9.]+)\"\s*([NSEW])", str(s) if s else "")
-            if not m:
-                return None
-            deg = int(m.group(1)); minutes = int(m.group(2)); seconds = float(m.group(3)); hemi = m.group(4)
-            val = deg + minutes / 60.0 + seconds / 3600.0
-            if hemi in ('S','W'):
-                val = -val
-            return val
-
-        py_points = []
-        for _, row in map_data.iterrows():
-            if pd.isna(row["Latitude"]) or pd.isna(row["Longitude"]):
-                continue
-            title = str(row.get("Found Address") or row.get("Address") or "")
-            lat = float(row["Latitude"]); lon = float(row["Longitude"]) 
-            ddm_lat = _parse_ddm(row.get("lat_ddm", "")); ddm_lon = _parse_ddm(row.get("lon_ddm", ""))
-            dms_lat = _parse_dms(row.get("lat_dms", "")); dms_lon = _parse_dms(row.get("lon_dms", ""))
-            def _close(a, b, tol=1e-6):
-                return (a is None) or (b is None) or abs(a-b) <= tol
-            if ddm_lat is not None and ddm_lon is not None and dms_lat is not None and dms_lon is not None and (not _close(ddm_lat, dms_lat) or not _close(ddm_lon, dms_lon)):
-                py_points.append({"lat": ddm_lat, "lng": ddm_lon, "title": f"{title} (DDM)", "color": "red"})
-                py_points.append({"lat": dms_lat, "lng": dms_lon, "title": f"{title} (DMS)", "color": "green"})
-            else:
-                py_points.append({"lat": lat, "lng": lon, "title": title, "color": "red"})
-
-        center = py_points[0] if py_points else {"lat": 32.08, "lng": 34.78}
         api_key_map = (st.session_state.get("google_api_key") or os.getenv("GOOGLE_MAPS_API_KEY") or "")
 
         if not api_key_map:
             # נפילה חזרה למפת PyDeck אם אין מפתח תקין
+            import pydeck as pdk
+
             scatter = pdk.Layer(
                 "ScatterplotLayer",
                 data=map_data,
@@ -484,41 +588,9 @@ if 'result_df' in st.session_state and st.session_state['result_df'] is not None
             st.warning("לא זוהה מפתח Google Maps. מציג מפה חלופית (PyDeck).")
             st.pydeck_chart(pdk.Deck(layers=[scatter], initial_view_state=pdk.ViewState(latitude=map_data.iloc[0]['Latitude'], longitude=map_data.iloc[0]['Longitude'], zoom=12)))
         else:
-            html = f"""
-<!doctype html>
-<html><head><meta charset=\"utf-8\" />
-<style>html,body,#map{{height:100%;margin:0;padding:0}} .note{{font:14px Arial;padding:8px}}</style>
-<script>
-  const POINTS = {json.dumps(py_points)};
-  function initMap() {{
-    const map = new google.maps.Map(document.getElementById('map'), {{
-      center: {{lat: {center['lat']}, lng: {center['lng']}}},
-      zoom: 12,
-      mapTypeId: 'roadmap'
-    }});
-    for (const p of POINTS) {{
-      new google.maps.Marker({{
-        position: {{lat: p.lat, lng: p.lng}},
-        map: map,
-        title: p.title,
-        icon: p.color === 'green' ? 'http://maps.google.com/mapfiles/ms/icons/green-dot.png' : 'http://maps.google.com/mapfiles/ms/icons/red-dot.png'
-      }});
-    }}
-  }}
-  // אם הספרייה לא עולה, נציג הודעה ידידותית אחרי טיים-אאוט קצר
-  setTimeout(function(){{
-    if (!(window.google && google.maps)) {{
-      document.getElementById('map').innerHTML = '<div class="note">בעיה בטעינת Google Maps. בדוק API Key, Billing והגבלות referrer (localhost/127.0.0.1).</div>';
-    }}
-  }}, 2500);
-</script>
-<script async defer src=\"https://maps.googleapis.com/maps/api/js?key={api_key_map}&callback=initMap\"></script>
-</head>
-<body>
-  <div id=\"map\" style=\"height:600px\"></div>
-</body></html>
-"""
-            components.html(html, height=600)
+            import streamlit.components.v1 as components
+
+            components.html(_cached_map_html(result_digest, api_key_map, result_df), height=600)
 
-    csv_output = result_df.to_csv(index=False).encode('utf-8-sig')
+    csv_output = _cached_csv_bytes(result_digest, result_df)
     st.download_button(label="📥 הורד קובץ תוצאות (CSV)", data=csv_output, file_name='addresses_with_coordinates.csv', mime='text/csv', use_container_width=True)
@@ -0,0 +1,87 @@
+"""מדידת זמן עלייה (cold start) לפי ``python -X importtime``.
+
+לכל יעד מריצים תהליך פייתון חדש כמה פעמים, סוכמים את הזמן המצטבר של
+הייבואים ברמה העליונה, ומשווים את החציון לתקציב שב-``importtime_budget.json``.
+יוצא עם קוד 1 אם יעד כלשהו חרג מהתקציב.
+
+    python scripts/importtime.py            # בדיקה מול התקציב
+    python scripts/importtime.py --verbose  # גם הייבואים הכבדים של כל יעד
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_PATH = Path(__file__).resolve().parent / "importtime_budget.json"
+
+TARGETS: dict[str, list[str]] = {
+    "itur geocode": ["-c", "import itur.__main__"],
+    "itur.webapp:app": ["-c", "import itur.webapp"],
+    # הרצה של הסקריפט במצב bare: הריצה הראשונה של הדף, לפני שהמשתמש הזין נתונים
+    "app.py": [str(ROOT / "app.py")],
+}
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S.*)$")
+
+
+def measure(args: list[str]) -> tuple[float, list[tuple[str, float]]]:
+    """(סך הכול במילישניות, הייבואים הישירים של היעד מהכבד לקל)."""
+    paths = [str(ROOT / "src"), os.environ.get("PYTHONPATH", "")]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in paths if p)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    direct: list[tuple[str, float]] = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        # ההזחה היא שני רווחים לכל רמה; הזמן המצטבר כולל את כל התלויות
+        depth = len(match.group(3)) // 2
+        ms = int(match.group(2)) / 1000.0
+        if depth == 0:
+            total += ms
+        elif depth == 1:
+            direct.append((match.group(4), ms))
+    return total, sorted(direct, key=lambda item: -item[1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="מספר הרצות לכל יעד (החציון נבדק)")
+    parser.add_argument("--budget", type=Path, default=BUDGET_PATH)
+    parser.add_argument("--verbose", "-v", action="store_true")
+    args = parser.parse_args()
+
+    budget: dict[str, float] = json.loads(args.budget.read_text(encoding="utf-8"))
+    failed = False
+    for name, target in TARGETS.items():
+        runs = [measure(target) for _ in range(max(1, args.runs))]
+        median = statistics.median(total for total, _ in runs)
+        limit = budget.get(name)
+        verdict = "ok" if limit is None or median <= limit else "OVER BUDGET"
+        failed |= verdict != "ok"
+        print(f"{name:18s} {median:8.1f}ms  budget {limit if limit is not None else '-':>6}ms  {verdict}")
+        if args.verbose:
+            for module, ms in runs[-1][1][:8]:
+                print(f"    {ms:8.1f}ms  {module}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,6 +14,50 @@ def _build_parser() -> argparse.ArgumentParser:
     geo.add_argument("--out", dest="out_path", required=True, help="קובץ פלט CSV")
     geo.add_argument("--col", dest="address_column", default=None, help="שם עמודת הכתובת")
     geo.add_argument("--sep", dest="delimiter", default=",", help="תו מפריד (ברירת מחדל: ,)")
+    geo.add_argument(
+        "--interpolate",
+        action="store_true",
+        help="קיבוץ לפי רחוב ואינטרפולציה של מספרי בית בין עוגנים (מהיר, פחות מדויק)",
+    )
+    geo.add_argument(
+        "--anchors", dest="anchors_per_street", type=int, default=3, help="מספר עוגנים לכל רחוב"
+    )
+    geo.add_argument(
+        "--previous",
+        dest="previous_path",
+        default=None,
+        help="קובץ פלט קודם: כתובות שלא השתנו ילקחו ממנו במקום גאוקודינג מחדש",
+    )
+    geo.add_argument(
+        "--key", dest="key_column", default=None, help="עמודת מזהה להשוואת שורות מול --previous"
+    )
+
+    towns = sub.add_parser("localities", help="רענון טבלת מרכזי היישובים")
+    towns.add_argument(
+        "--source", default=None, help="CSV של יישובים למיזוג (עמודת name, ואופציונלית lat, lon, aliases)"
+    )
+    towns.add_argument("--out", dest="out_path", default=None, help="קובץ יעד (ברירת מחדל: מטמון המשתמש)")
+    towns.add_argument(
+        "--no-geocode", action="store_true", help="רק מיזוג, בלי לחשב מחדש מרכזים מול Nominatim"
+    )
+
+    fake = sub.add_parser("fake-provider", help="שרת ספק מקומי (Nominatim/Google) לבדיקות עומס")
+    fake.add_argument("--host", default="127.0.0.1")
+    fake.add_argument("--port", type=int, default=8081)
+    fake.add_argument("--latency-ms", type=float, default=50.0, help="השהיה ממוצעת לתשובה")
+    fake.add_argument("--jitter-ms", type=float, default=20.0, help="סטייה אקראית מההשהיה")
+    fake.add_argument("--error-rate", type=float, default=0.0, help="שיעור תשובות 500")
+    fake.add_argument("--throttle-rate", type=float, default=0.0, help="שיעור תשובות 429 / OVER_QUERY_LIMIT")
+    fake.add_argument("--miss-rate", type=float, default=0.0, help="שיעור שאילתות ללא תוצאה")
+    fake.add_argument("--geojson-points", type=int, default=500, help="גודל LineString בשאילתות geojson")
+
+    load = sub.add_parser("loadtest", help="בדיקת עומס על itur.webapp")
+    load.add_argument("--url", default="http://127.0.0.1:8000", help="כתובת השרת הנבדק")
+    load.add_argument("--concurrency", type=int, default=8, help="מספר לקוחות במקביל")
+    load.add_argument("--jobs", type=int, default=100, help="מספר העלאות")
+    load.add_argument("--rows", type=int, default=20, help="שורות בכל קובץ")
+    load.add_argument("--download-ratio", type=float, default=0.5, help="שיעור העלאות שאחריהן הורדה")
+    load.add_argument("--pid", dest="pids", type=int, action="append", default=[], help="PID של worker למדידת זיכרון")
 
     return parser
 
@@ -28,10 +72,79 @@ def main() -> None:
         return
 
     if args.command == "geocode":
-        geocode_csv(args.in_path, args.out_path, address_column=args.address_column, delimiter=args.delimiter)
+        summary = geocode_csv(
+            args.in_path,
+            args.out_path,
+            address_column=args.address_column,
+            delimiter=args.delimiter,
+            interpolate=args.interpolate,
+            anchors_per_street=args.anchors_per_street,
+            previous_path=args.previous_path,
+            key_column=args.key_column,
+        )
+        if summary is not None:
+            print(
+                f"נוספו {summary.added}, שונו {summary.changed}, הוסרו {summary.removed}, "
+                f"ללא שינוי {summary.unchanged} שורות"
+            )
+            print(f"גאוקודו {summary.geocoded} כתובות; {summary.reused} שורות נלקחו מהפלט הקודם")
         print(f"נכתב קובץ פלט אל: {args.out_path}")
         return
 
+    if args.command == "localities":
+        from .geocode import _nominatim
+        from .localities import refresh_localities, user_table
+
+        geocode = None
+        if not args.no_geocode:
+            query = _nominatim()
+
+            def geocode(name: str):
+                try:
+                    location = query(name, country_codes="il")
+                except Exception:
+                    return None
+                return (float(location.latitude), float(location.longitude)) if location else None
+
+        count = refresh_localities(args.out_path, source=args.source, geocode=geocode)
+        print(f"נכתבו {count} יישובים אל: {args.out_path or user_table()}")
+        return
+
+    if args.command == "fake-provider":
+        from .fakeprovider import FakeProviderConfig, FakeProviderServer
+
+        config = FakeProviderConfig(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            miss_rate=args.miss_rate,
+            geojson_points=args.geojson_points,
+        )
+        server = FakeProviderServer((args.host, args.port), config)
+        print(f"ספק מקומי מאזין ב-{server.url} (ITUR_NOMINATIM_URL={server.url})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.command == "loadtest":
+        from .loadtest import LoadTestConfig, run_load_test
+
+        report = run_load_test(
+            LoadTestConfig(
+                url=args.url,
+                concurrency=args.concurrency,
+                jobs=args.jobs,
+                rows=args.rows,
+                download_ratio=args.download_ratio,
+                pids=args.pids,
+            )
+        )
+        print(report.format())
+        return
+
     parser.print_help()
 
 
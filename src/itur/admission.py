@@ -0,0 +1,158 @@
+"""בקרת כניסה וחלוקה הוגנת של תקציב הספק בין לקוחות השרת.
+
+``AdmissionController`` מגביל את מספר העבודות הפעילות (בסך הכול ולכל
+לקוח), מחזיק תור המתנה חסום, ודוחה מיד עם ``Overloaded`` כשהתור מלא —
+כך השרת נשאר זמין גם תחת עומס פתאומי. ``JobTicket.locator`` מסמן את
+הכרטיס כשער ההוגנות (``provider_gate``) של הקריאות שהוא עוטף: כשכמה
+עבודות ממתינות לשליחה לספק, בקר הקצב נותן את התור הבא לעבודה שקיבלה עד
+כה הכי מעט קריאות, כך שעבודה קטנה לא נתקעת מאחורי העלאה של 100 אלף
+שורות. תשובות מקומיות לא ממתינות לאף אחד.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Optional
+import itertools
+import threading
+import time
+
+from .geocode import Locator
+from .ratecontrol import provider_gate
+
+
+class Overloaded(Exception):
+    """העבודה נדחתה; ``retry_after`` בשניות, ``queue_position`` — המקום שהיה לה בתור."""
+
+    def __init__(self, reason: str, *, retry_after: int, queue_position: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.queue_position = queue_position
+
+
+class JobTicket:
+    def __init__(self, controller: "AdmissionController", client: str, job_id: int) -> None:
+        self.controller = controller
+        self.client = client
+        self.job_id = job_id
+        self._released = False
+
+    def locator(self, base: Locator) -> Locator:
+        """עוטף locator כך שכל שליחה לספק בתוכו ממתינה לתורה ההוגן מול שאר העבודות."""
+
+        def locate(address: str):
+            token = provider_gate.set(self)
+            try:
+                return base(address)
+            finally:
+                provider_gate.reset(token)
+
+        return locate
+
+    def priority(self) -> tuple[int, ...]:
+        return self.controller._priority(self)
+
+    def sent(self) -> None:
+        self.controller._record_sent(self)
+
+    def release(self) -> None:
+        """משחרר את העבודה; בטוח לקריאה חוזרת."""
+        self.controller._release(self)
+
+    def __enter__(self) -> "JobTicket":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        *,
+        max_jobs: int = 8,
+        max_jobs_per_client: int = 2,
+        max_queue: int = 16,
+        queue_timeout: float = 30.0,
+    ) -> None:
+        self.max_jobs = max_jobs
+        self.max_jobs_per_client = max_jobs_per_client
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._ids = itertools.count(1)
+        self._active: dict[int, JobTicket] = {}
+        self._per_client: Counter[str] = Counter()
+        self._queue: list[int] = []
+        # חלוקת הספק: כמה קריאות כל עבודה פעילה שלחה
+        self._served: Counter[int] = Counter()
+
+    def snapshot(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                "active_jobs": len(self._active),
+                "queued_jobs": len(self._queue),
+                "max_jobs": self.max_jobs,
+            }
+
+    def admit(self, client: str, timeout: Optional[float] = None) -> JobTicket:
+        """מקבל עבודה, ממתין בתור אם צריך, או מעלה ``Overloaded``. חוסם — להריץ ב-thread."""
+        deadline = time.monotonic() + (self.queue_timeout if timeout is None else timeout)
+        with self._cond:
+            if self._per_client[client] >= self.max_jobs_per_client:
+                raise Overloaded(
+                    "יותר מדי עבודות פעילות ללקוח זה",
+                    retry_after=5,
+                    queue_position=len(self._queue) + 1,
+                )
+            job_id = next(self._ids)
+            if len(self._active) >= self.max_jobs or self._queue:
+                if len(self._queue) >= self.max_queue:
+                    raise Overloaded(
+                        "השרת עמוס", retry_after=10, queue_position=len(self._queue) + 1
+                    )
+                self._queue.append(job_id)
+                # מונים את העבודה ללקוח כבר בתור, כדי שלא יציף את התור בעצמו
+                self._per_client[client] += 1
+                try:
+                    while self._queue[0] != job_id or len(self._active) >= self.max_jobs:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            position = self._queue.index(job_id) + 1
+                            raise Overloaded("תם זמן ההמתנה בתור", retry_after=10, queue_position=position)
+                        self._cond.wait(remaining)
+                except BaseException:
+                    self._queue.remove(job_id)
+                    self._per_client[client] -= 1
+                    self._cond.notify_all()
+                    raise
+                self._queue.pop(0)
+            else:
+                self._per_client[client] += 1
+            ticket = JobTicket(self, client, job_id)
+            self._active[job_id] = ticket
+            self._cond.notify_all()
+            return ticket
+
+    def _release(self, ticket: JobTicket) -> None:
+        with self._cond:
+            if ticket._released:
+                return
+            ticket._released = True
+            self._active.pop(ticket.job_id, None)
+            self._per_client[ticket.client] -= 1
+            if self._per_client[ticket.client] <= 0:
+                del self._per_client[ticket.client]
+            self._served.pop(ticket.job_id, None)
+            self._cond.notify_all()
+
+    def _priority(self, ticket: JobTicket) -> tuple[int, ...]:
+        # העבודה שקיבלה הכי מעט קריאות; בשוויון — הוותיקה
+        with self._cond:
+            return self._served[ticket.job_id], ticket.job_id
+
+    def _record_sent(self, ticket: JobTicket) -> None:
+        with self._cond:
+            if not ticket._released:
+                self._served[ticket.job_id] += 1
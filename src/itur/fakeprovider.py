@@ -0,0 +1,157 @@
+"""שרת ספק גאוקודינג מקומי לבדיקות עומס.
+
+מדבר JSON תואם Nominatim (``/search``) ו-Google Geocoding
+(``/maps/api/geocode/json``), עם השהיה, שגיאות, חסימת קצב (429 /
+``OVER_QUERY_LIMIT``) וגיאומטריות geojson גדולות — לפי ``FakeProviderConfig``.
+התשובות דטרמיניסטיות: אותה שאילתה תמיד מחזירה אותה נקודה.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+import hashlib
+import json
+import random
+import threading
+import time
+
+
+@dataclass
+class FakeProviderConfig:
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    miss_rate: float = 0.0
+    # מספר הנקודות ב-LineString שמוחזר לשאילתות עם polygon_geojson=1
+    geojson_points: int = 500
+
+
+def _point_for(query: str) -> tuple[float, float, float]:
+    """נקודה דטרמיניסטית בתוך ישראל, ועוד ערך [0, 1) לבחירת "לא נמצא"."""
+    digest = hashlib.blake2b(query.encode("utf-8"), digest_size=12).digest()
+    a, b, c = (int.from_bytes(digest[i:i + 4], "big") / 2**32 for i in (0, 4, 8))
+    return 29.5 + a * 3.8, 34.3 + b * 1.4, c
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeProviderServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        config = self.server.config
+        rng = self.server.rng()
+
+        delay = max(0.0, config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms))
+        time.sleep(delay / 1000.0)
+        self.server.count_request()
+
+        if url.path == "/search":
+            self._nominatim(params, rng)
+        elif url.path == "/maps/api/geocode/json":
+            self._google(params, rng)
+        else:
+            self._send(404, {"error": "not found"})
+
+    def _nominatim(self, params: dict[str, str], rng: random.Random) -> None:
+        config = self.server.config
+        if rng.random() < config.throttle_rate:
+            self._send(429, {"error": "Too Many Requests"})
+            return
+        if rng.random() < config.error_rate:
+            self._send(500, {"error": "Internal Server Error"})
+            return
+        query = params.get("q") or ", ".join(
+            params[k] for k in ("street", "city") if k in params
+        )
+        lat, lon, pick = _point_for(query)
+        if pick < config.miss_rate:
+            self._send(200, [])
+            return
+        place: dict[str, Any] = {
+            "place_id": int(pick * 1e9),
+            "lat": f"{lat:.7f}",
+            "lon": f"{lon:.7f}",
+            "display_name": query,
+            "type": "residential",
+        }
+        if params.get("polygon_geojson"):
+            n = max(2, config.geojson_points)
+            place["geojson"] = {
+                "type": "LineString",
+                "coordinates": [[lon + i * 1e-5, lat + i * 1e-5] for i in range(n)],
+            }
+        self._send(200, [place])
+
+    def _google(self, params: dict[str, str], rng: random.Random) -> None:
+        config = self.server.config
+        if rng.random() < config.throttle_rate:
+            self._send(200, {"status": "OVER_QUERY_LIMIT", "results": []})
+            return
+        if rng.random() < config.error_rate:
+            self._send(500, {"status": "UNKNOWN_ERROR", "results": []})
+            return
+        query = params.get("address", "")
+        lat, lon, pick = _point_for(query)
+        if pick < config.miss_rate:
+            self._send(200, {"status": "ZERO_RESULTS", "results": []})
+            return
+        self._send(200, {
+            "status": "OK",
+            "results": [{
+                "formatted_address": f"{query}, ישראל",
+                "geometry": {"location": {"lat": lat, "lng": lon}, "location_type": "ROOFTOP"},
+                "place_id": f"fake-{int(pick * 1e9)}",
+            }],
+        })
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int] = ("127.0.0.1", 0), config: Optional[FakeProviderConfig] = None
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.config = config or FakeProviderConfig()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._seed = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def rng(self) -> random.Random:
+        with self._lock:
+            self._seed += 1
+            return random.Random(self._seed)
+
+    def start(self) -> threading.Thread:
+        """מריץ את השרת ב-thread ברקע (לבדיקות)."""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
@@ -1,9 +1,22 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass
-from typing import Callable, Iterable, Optional, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional, Sequence, overload
+from urllib.parse import urlsplit
+import bisect
 import csv
+import hashlib
+import math
+import os
 import re
+import sqlite3
+import sys
+import threading
+
+if TYPE_CHECKING:
+    from .localities import LocalityIndex
 
 
 @dataclass
@@ -11,17 +24,331 @@ class GeocodeResult:
     address: str
     lat: Optional[float]
     lon: Optional[float]
+    # True אם הנקודה חושבה באינטרפולציה בין מספרי בית ולא התקבלה מהספק
+    interpolated: bool = False
 
 
 Locator = Callable[[str], Optional[tuple[float, float]]]
 
+# קודי סטטוס קומפקטיים של GeocodeBatch
+STATUS_NOT_FOUND = 0
+STATUS_FOUND = 1
+STATUS_INTERPOLATED = 2
+
+
+class GeocodeBatch(Sequence[GeocodeResult]):
+    """תוצאות גאוקודינג בייצוג עמודתי.
+
+    במקום אובייקט לכל שורה: קווי רוחב/אורך ב-``array('d')`` (NaN כשאין
+    נקודה), סטטוס בבית אחד לשורה, והפניות לכתובות אחרי ``sys.intern`` —
+    כך כתובות שחוזרות על עצמן נשמרות פעם אחת. גישה באינדקס או באיטרציה
+    מחזירה ``GeocodeResult`` זמני, כך שקוד קיים ממשיך לעבוד כמו עם רשימה.
+    """
+
+    __slots__ = ("addresses", "lat", "lon", "status")
+
+    def __init__(self) -> None:
+        self.addresses: list[str] = []
+        self.lat = array("d")
+        self.lon = array("d")
+        self.status = array("b")
+
+    @classmethod
+    def empty(cls, addresses: Sequence[str]) -> "GeocodeBatch":
+        """אצווה בגודל ``len(addresses)`` שכל שורותיה "לא נמצא"."""
+        batch = cls()
+        batch.addresses = [sys.intern(a) for a in addresses]
+        n = len(batch.addresses)
+        batch.lat = array("d", [math.nan]) * n
+        batch.lon = array("d", [math.nan]) * n
+        batch.status = array("b", [STATUS_NOT_FOUND]) * n
+        return batch
+
+    def append(
+        self, address: str, coords: Optional[tuple[float, float]], *, interpolated: bool = False
+    ) -> None:
+        self.addresses.append(sys.intern(address))
+        self.lat.append(math.nan)
+        self.lon.append(math.nan)
+        self.status.append(STATUS_NOT_FOUND)
+        self.set(len(self.addresses) - 1, coords, interpolated=interpolated)
+
+    def set(
+        self, index: int, coords: Optional[tuple[float, float]], *, interpolated: bool = False
+    ) -> None:
+        if coords is None:
+            self.lat[index] = self.lon[index] = math.nan
+            self.status[index] = STATUS_NOT_FOUND
+            return
+        self.lat[index], self.lon[index] = coords
+        self.status[index] = STATUS_INTERPOLATED if interpolated else STATUS_FOUND
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    @overload
+    def __getitem__(self, index: int) -> GeocodeResult: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[GeocodeResult]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        status = self.status[index]
+        found = status != STATUS_NOT_FOUND
+        return GeocodeResult(
+            address=self.addresses[index],
+            lat=self.lat[index] if found else None,
+            lon=self.lon[index] if found else None,
+            interpolated=status == STATUS_INTERPOLATED,
+        )
+
+    def __iter__(self) -> Iterator[GeocodeResult]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def coordinate_columns(self) -> Iterator[tuple[Optional[float], Optional[float], list[str]]]:
+        """(lat, lon, עמודות DDM/DMS) לכל שורה, ישירות מהמערכים."""
+        lat, lon, status = self.lat, self.lon, self.status
+        for i in range(len(self)):
+            if status[i] == STATUS_NOT_FOUND:
+                yield None, None, _coordinate_columns(None, None)
+            else:
+                yield lat[i], lon[i], _coordinate_columns(lat[i], lon[i])
+
+    def to_numpy(self) -> tuple[Any, Any, Any]:
+        """(lat, lon, status) כמערכי NumPy שחולקים את הזיכרון עם האצווה (ללא העתקה).
+
+        כל עוד המערכים קיימים אי אפשר להוסיף שורות לאצווה.
+        """
+        import numpy as np  # type: ignore
+
+        return (
+            np.frombuffer(self.lat, dtype=np.float64),
+            np.frombuffer(self.lon, dtype=np.float64),
+            np.frombuffer(self.status, dtype=np.int8),
+        )
+
+    def to_pandas(self) -> Any:
+        """DataFrame עם העמודות address, lat, lon, status."""
+        import pandas as pd  # type: ignore
+
+        lat, lon, status = self.to_numpy()
+        return pd.DataFrame(
+            {"address": self.addresses, "lat": lat, "lon": lon, "status": status}, copy=False
+        )
+
+
+# סף פישוט גיאומטריה (במעלות) שנשלח ל-Nominatim; נקודות הקצה נשמרות בפישוט
+STREET_GEOMETRY_THRESHOLD = 0.001
+
+
+def _cache_dir() -> Path:
+    env = os.environ.get("ITUR_CACHE_DIR")
+    return Path(env) if env else Path.home() / ".cache" / "itur"
+
+
+def _normalize_key(value: str) -> str:
+    return " ".join(value.split())
+
+
+_PARTS_RE = re.compile(r"[;|,]+")
+_DIGIT_RE = re.compile(r"\d")
+_NON_DIGIT_RE = re.compile(r"\D")
+_NUMBER_ONLY_RE = re.compile(r"\d+")
+
+
+def _split_parts(text: str) -> list[str]:
+    """פיצול בסיסי של כתובת לפי מפרידים נפוצים."""
+    return [p.strip() for p in _PARTS_RE.split(text) if p.strip()]
 
-def _default_locator() -> Locator:
+
+_STREET_NUMBER_RE = re.compile(r"^(?P<street>.*?\D)\s*(?P<number>\d+)$")
+_NUMBER_STREET_RE = re.compile(r"^(?P<number>\d+)\s+(?P<street>.*\D.*)$")
+
+
+def _parse_street_address(text: str) -> Optional[tuple[str, str, int]]:
+    """מזהה כתובת מהצורה "רחוב מספר, עיר" ומחזיר (עיר, רחוב, מספר).
+
+    מספרי בית עם תוספת (למשל 12א) אינם מזוהים, ונשלחים לספק כמו שהם.
+    """
+    parts = _split_parts(text)
+    if len(parts) < 2:
+        return None
+    component = parts[-2]
+    match = _STREET_NUMBER_RE.match(component) or _NUMBER_STREET_RE.match(component)
+    if not match:
+        return None
+    street = match.group("street").strip(" -")
+    if not street or not _NON_DIGIT_RE.search(street):
+        return None
+    return parts[-1], street, int(match.group("number"))
+
+
+class StreetStartStore:
+    """מאגר נקודות התחלה של רחובות לפי (עיר, רחוב).
+
+    נשמרת רק הנקודה שנבחרה, כך שכל רחוב נשלף מהספק פעם אחת בלבד.
+    אם ניתן נתיב — המאגר הוא קובץ SQLite: כל עדכון הוא הכנסה בודדת (ולא
+    שכתוב של כל הקובץ), ותהליכים שונים (workers של השרת, CLI) חולקים אותו
+    בבטחה ורואים זה את הרשומות של זה. קובץ פגום מטופל כמטמון ריק.
+    """
+
+    def __init__(self, path: Optional[str | Path] = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._data: dict[tuple[str, str], tuple[float, float]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        if self.path is not None:
+            conn: Optional[sqlite3.Connection] = None
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), timeout=10.0, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS street_starts ("
+                    " city TEXT NOT NULL, street TEXT NOT NULL,"
+                    " lat REAL NOT NULL, lon REAL NOT NULL,"
+                    " PRIMARY KEY (city, street))"
+                )
+                conn.commit()
+                self._conn = conn
+            except (OSError, sqlite3.Error):
+                # מטמון בלבד — קובץ פגום או לא נגיש לא מפיל את הגאוקודינג
+                if conn is not None:
+                    conn.close()
+                self._conn = None
+
+    def get(self, city: str, street: str) -> Optional[tuple[float, float]]:
+        key = (_normalize_key(city), _normalize_key(street))
+        with self._lock:
+            if key in self._data:
+                return self._data[key]
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT lat, lon FROM street_starts WHERE city = ? AND street = ?", key
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+            if row is None:
+                return None
+            try:
+                coords = (float(row[0]), float(row[1]))
+            except (TypeError, ValueError):
+                return None
+            self._data[key] = coords
+            return coords
+
+    def put(self, city: str, street: str, coords: tuple[float, float]) -> None:
+        key = (_normalize_key(city), _normalize_key(street))
+        value = (float(coords[0]), float(coords[1]))
+        with self._lock:
+            self._data[key] = value
+            if self._conn is None:
+                return
+            try:
+                # הכותב הראשון קובע; תהליך אחר שכבר שמר את הרחוב לא נדרס
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO street_starts (city, street, lat, lon) VALUES (?, ?, ?, ?)",
+                        (*key, *value),
+                    )
+                    row = self._conn.execute(
+                        "SELECT lat, lon FROM street_starts WHERE city = ? AND street = ?", key
+                    ).fetchone()
+                if row is not None:
+                    self._data[key] = (float(row[0]), float(row[1]))
+            except (sqlite3.Error, TypeError, ValueError):
+                pass
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._conn is None:
+                return len(self._data)
+            try:
+                return int(self._conn.execute("SELECT COUNT(*) FROM street_starts").fetchone()[0])
+            except sqlite3.Error:
+                return len(self._data)
+
+
+def _street_start(geo: object) -> Optional[tuple[float, float]]:
+    """מחלץ את נקודת ההתחלה (lat, lon) מגיאומטריית GeoJSON של רחוב."""
+    if not isinstance(geo, dict):
+        return None
+    gtype = geo.get("type")
+    coords = geo.get("coordinates")
+    if gtype == "LineString" and isinstance(coords, list) and coords:
+        lon, lat = coords[0][:2]
+        return float(lat), float(lon)
+    if gtype == "MultiLineString" and isinstance(coords, list) and coords and coords[0]:
+        lon, lat = coords[0][0][:2]
+        return float(lat), float(lon)
+    return None
+
+
+def _nominatim() -> Callable[..., Any]:
+    """``geocode`` של Nominatim דרך בקר הקצב המשותף של השרת שהוגדר."""
+    from geopy import adapters as geopy_adapters  # type: ignore
     from geopy.geocoders import Nominatim  # type: ignore
-    from geopy.extra.rate_limiter import RateLimiter  # type: ignore
 
-    geolocator = Nominatim(user_agent="itur-geocoder")
-    rate_limited = RateLimiter(geolocator.geocode, min_delay_seconds=1.0)
+    from .ratecontrol import rate_controller
+
+    def _adapter(**kwargs: Any):
+        # urllib3 מנסה שוב בעצמו על 429 עם Retry-After ומסתיר את החסימה מבקר
+        # הקצב; משאירים לו רק ניסיונות חוזרים על תקלות חיבור
+        if not geopy_adapters.RequestsAdapter.is_available:
+            return geopy_adapters.URLLibAdapter(**kwargs)
+        from urllib3.util.retry import Retry  # type: ignore
+
+        return geopy_adapters.RequestsAdapter(
+            **kwargs, max_retries=Retry(total=2, read=False, respect_retry_after_header=False)
+        )
+
+    class _SimplifiedNominatim(Nominatim):
+        # בקשת גיאומטריה מפושטת כדי לא להוריד את כל ה-LineString של רחובות ארוכים
+        def _construct_url(self, base_api, params):
+            if params.get("polygon_geojson"):
+                params = {**params, "polygon_threshold": STREET_GEOMETRY_THRESHOLD}
+            return super()._construct_url(base_api, params)
+
+    # ITUR_NOMINATIM_URL מפנה לשרת אחר (למשל itur fake-provider בבדיקות עומס)
+    endpoint = urlsplit(os.environ.get("ITUR_NOMINATIM_URL", "https://nominatim.openstreetmap.org"))
+    geolocator = _SimplifiedNominatim(
+        user_agent="itur-geocoder",
+        domain=endpoint.netloc,
+        scheme=endpoint.scheme or "https",
+        adapter_factory=_adapter,
+    )
+    # מדיניות השרת הציבורי: עד בקשה אחת בשנייה; שרת עצמאי יכול להרשות יותר
+    default_max = 1.0 if endpoint.netloc == "nominatim.openstreetmap.org" else 20.0
+    max_rate = float(os.environ.get("ITUR_NOMINATIM_MAX_RATE") or default_max)
+    controller = rate_controller(f"nominatim:{endpoint.netloc}", initial_rate=1.0, max_rate=max_rate)
+    return controller.wrap(geolocator.geocode, max_retries=2)
+
+
+def _default_locator(
+    street_store: Optional[StreetStartStore] = None, localities: Optional["LocalityIndex"] = None
+) -> Locator:
+    from .localities import default_localities
+
+    # הלקוח של Nominatim (ו-geopy עצמו) נבנה רק בפנייה הראשונה לרשת: ריצה
+    # שנענית כולה מטבלת היישובים, ממאגר הרחובות או מפלט קודם לא משלמת עליו
+    query: Optional[Callable[..., Any]] = None
+
+    def rate_limited(*args: Any, **kwargs: Any) -> Any:
+        nonlocal query
+        if query is None:
+            query = _nominatim()
+        return query(*args, **kwargs)
+
+    towns = localities if localities is not None else default_localities()
+    streets = street_store if street_store is not None else StreetStartStore(
+        _cache_dir() / "street_starts.sqlite3"
+    )
 
     def locate(address: str) -> Optional[tuple[float, float]]:
         """מגאוקד עם כללים:
@@ -30,17 +357,20 @@ def _default_locator() -> Locator:
         - עיר + מספר בלבד → מרכז העיר
         - עיר + רחוב + מספר → הכתובת המלאה
         אם לא ניתן לזהות — ניסיון גנרי.
+        מרכז עיר נלקח מטבלת היישובים המובנית, ורק עיר שאינה בה נשלחת לספק.
         """
         text = address.strip()
         if not text:
             return None
 
-        # פיצול בסיסי לפי מפרידים נפוצים
-        parts = [p.strip() for p in re.split(r"[;|,]+", text) if p.strip()]
+        parts = _split_parts(text)
 
         try:
             # עיר בלבד
             if len(parts) == 1:
+                known = towns.get(parts[0])
+                if known is not None:
+                    return known
                 location = rate_limited(parts[0], addressdetails=True)
                 if not location:
                     return None
@@ -50,38 +380,38 @@ def _default_locator() -> Locator:
             prev = parts[-2]
 
             # עיר + מספר בלבד → מרכז העיר
-            if len(parts) == 2 and re.fullmatch(r"\d+", prev):
+            if len(parts) == 2 and _NUMBER_ONLY_RE.fullmatch(prev):
+                known = towns.get(city)
+                if known is not None:
+                    return known
                 location = rate_limited(city, addressdetails=True)
                 if not location:
                     return None
                 return float(location.latitude), float(location.longitude)
 
             # אם יש מספר בתוך רכיב הרחוב → נתייחס כרחוב+מספר
-            if re.search(r"\d", prev):
+            if _DIGIT_RE.search(prev):
                 q = f"{prev}, {city}"
                 location = rate_limited(q, addressdetails=True)
                 if not location:
                     return None
                 return float(location.latitude), float(location.longitude)
 
-            # עיר + רחוב ללא מספר → נבקש גיאומטריה וניקח את תחילת הרחוב
-            location = geolocator.geocode(
+            # עיר + רחוב ללא מספר → תחילת הרחוב, מהמאגר או מגיאומטריה מפושטת
+            cached = streets.get(city, prev)
+            if cached is not None:
+                return cached
+            location = rate_limited(
                 {"city": city, "street": prev}, addressdetails=True, geometry="geojson"
             )
             if location:
                 raw = getattr(location, "raw", {}) or {}
-                geo = raw.get("geojson")
-                if isinstance(geo, dict):
-                    gtype = geo.get("type")
-                    coords = geo.get("coordinates")
-                    if gtype == "LineString" and isinstance(coords, list) and coords:
-                        lon, lat = coords[0]
-                        return float(lat), float(lon)
-                    if gtype == "MultiLineString" and isinstance(coords, list) and coords and coords[0]:
-                        lon, lat = coords[0][0]
-                        return float(lat), float(lon)
                 # נפילה חזרה לנקודה אם אין גאו־ג׳יסון
-                return float(location.latitude), float(location.longitude)
+                start = _street_start(raw.get("geojson")) or (
+                    float(location.latitude), float(location.longitude)
+                )
+                streets.put(city, prev, start)
+                return start
 
             # אם לא נמצא — ניסיון גנרי
             location = rate_limited(text, addressdetails=True)
@@ -90,22 +420,121 @@ def _default_locator() -> Locator:
             return float(location.latitude), float(location.longitude)
 
         except Exception:
-            # לא להפיל את כל הריצה — נחזיר None במקרה חריג
+            # לא להפיל את כל הריצה — נחזיר None במקרה חריג; חסימות קצב כבר
+            # נרשמו בבקר ומאטות את כל הקריאות האחרות לאותו ספק
             return None
 
     return locate
 
 
 def geocode_addresses(
+    addresses: Iterable[str],
+    locator: Optional[Locator] = None,
+    *,
+    interpolate: bool = False,
+    anchors_per_street: int = 3,
+) -> GeocodeBatch:
+    """מגאוקד רשימת כתובות ומחזיר ``GeocodeBatch``.
+
+    עם ``interpolate=True`` השורות מקובצות לפי (עיר, רחוב, זוגיות): מספרים
+    זוגיים ואי־זוגיים נמצאים בצדדים שונים של הרחוב, ולכן לכל צד נשלפים
+    מהספק רק ``anchors_per_street`` מספרי עוגן, ושאר מספרי הבית מחושבים
+    מקומית לאורך הקו השבור שעובר דרך עוגני אותו צד (ומסומנים ב-``interpolated``).
+    """
+    loc = locator or _default_locator()
+    if interpolate:
+        return _geocode_planned(list(addresses), loc, anchors_per_street)
+    batch = GeocodeBatch()
+    for addr in addresses:
+        batch.append(addr, loc(addr))
+    return batch
+
+
+def iter_geocode_addresses(
     addresses: Iterable[str], locator: Optional[Locator] = None
-) -> list[GeocodeResult]:
+) -> Iterator[GeocodeResult]:
+    """כמו ``geocode_addresses`` אך מחזיר כל תוצאה מיד כשהיא מוכנה."""
     loc = locator or _default_locator()
-    results: list[GeocodeResult] = []
     for addr in addresses:
         coords = loc(addr)
         lat, lon = (coords if coords is not None else (None, None))
-        results.append(GeocodeResult(address=addr, lat=lat, lon=lon))
-    return results
+        yield GeocodeResult(address=addr, lat=lat, lon=lon)
+
+
+def _pick_anchors(numbers: Sequence[int], count: int) -> list[int]:
+    """בחירת מספרי עוגן בפריסה אחידה, כולל הקטן והגדול ביותר."""
+    if len(numbers) <= count:
+        return list(numbers)
+    step = (len(numbers) - 1) / (count - 1)
+    return sorted({numbers[round(i * step)] for i in range(count)})
+
+
+def _interpolate_number(
+    number: int, known: dict[int, tuple[float, float]]
+) -> Optional[tuple[float, float]]:
+    """אינטרפולציה ליניארית בין שני העוגנים הסמוכים; None מחוץ לטווח."""
+    keys = sorted(known)
+    pos = bisect.bisect_left(keys, number)
+    if pos == 0 or pos == len(keys):
+        return None
+    lo, hi = keys[pos - 1], keys[pos]
+    t = (number - lo) / (hi - lo)
+    (lat1, lon1), (lat2, lon2) = known[lo], known[hi]
+    return lat1 + (lat2 - lat1) * t, lon1 + (lon2 - lon1) * t
+
+
+def _geocode_planned(
+    addresses: list[str], loc: Locator, anchors_per_street: int
+) -> GeocodeBatch:
+    anchors_per_street = max(2, anchors_per_street)
+    memo: dict[str, Optional[tuple[float, float]]] = {}
+
+    def resolve(addr: str) -> Optional[tuple[float, float]]:
+        key = _normalize_key(addr)
+        if key not in memo:
+            memo[key] = loc(addr)
+        return memo[key]
+
+    batch = GeocodeBatch.empty(addresses)
+    streets: dict[tuple[str, str, int], dict[int, list[int]]] = {}
+    for i, addr in enumerate(addresses):
+        parsed = _parse_street_address(addr)
+        if parsed is None:
+            batch.set(i, resolve(addr))
+            continue
+        city, street, number = parsed
+        key = (_normalize_key(city), _normalize_key(street), number % 2)
+        streets.setdefault(key, {}).setdefault(number, []).append(i)
+
+    for rows_by_number in streets.values():
+        numbers = sorted(rows_by_number)
+        anchors = _pick_anchors(numbers, anchors_per_street)
+        known: dict[int, tuple[float, float]] = {}
+        for number in anchors:
+            rows = rows_by_number[number]
+            found = resolve(addresses[rows[0]])
+            if found is not None:
+                known[number] = found
+            for i in rows:
+                batch.set(i, found)
+        anchor_set = set(anchors)
+        for number in numbers:
+            if number in anchor_set:
+                continue
+            rows = rows_by_number[number]
+            found = _interpolate_number(number, known)
+            if found is None:
+                # מחוץ לטווח העוגנים שנמצאו — שאילתה מדויקת, והנקודה הופכת לעוגן
+                found = resolve(addresses[rows[0]])
+                if found is not None:
+                    known[number] = found
+                is_interpolated = False
+            else:
+                is_interpolated = True
+            for i in rows:
+                batch.set(i, found, interpolated=is_interpolated)
+
+    return batch
 
 
 def _deg_to_ddm(value: float, *, is_lat: bool) -> str:
@@ -126,6 +555,88 @@ def _deg_to_dms(value: float, *, is_lat: bool) -> str:
             else f"{deg:03d}° {minutes:02d}' {seconds:05.2f}\" {sign}")
 
 
+def _coordinate_columns(lat: Optional[float], lon: Optional[float]) -> list[str]:
+    """עמודות התצוגה (lat_ddm, lon_ddm, lat_dms, lon_dms); ריקות כשאין נקודה."""
+    return [
+        _deg_to_ddm(lat, is_lat=True) if lat is not None else "",
+        _deg_to_ddm(lon, is_lat=False) if lon is not None else "",
+        _deg_to_dms(lat, is_lat=True) if lat is not None else "",
+        _deg_to_dms(lon, is_lat=False) if lon is not None else "",
+    ]
+
+
+@dataclass
+class RefreshSummary:
+    """סיכום הבדלים מול קובץ פלט קודם (``geocode_csv(previous_path=...)``)."""
+
+    added: int
+    changed: int
+    removed: int
+    unchanged: int
+    reused: int
+    geocoded: int
+
+
+def _address_hash(address: str) -> bytes:
+    return hashlib.blake2b(_normalize_key(address).encode("utf-8"), digest_size=16).digest()
+
+
+def _address_column_index(header: Optional[Sequence[str]], address_column: Optional[str]) -> int:
+    """עמודת הכתובת: ``address_column`` אם ניתנה ויש כותרת, אחרת העמודה הראשונה."""
+    if not (address_column and header):
+        return 0
+    try:
+        return list(header).index(address_column)
+    except ValueError as exc:
+        raise ValueError(f"העמודה '{address_column}' לא נמצאה בכותרת: {header}") from exc
+
+
+def _last_index(header: Sequence[str], name: str) -> int:
+    # עמודות הפלט מתווספות בסוף, אחרי עמודות באותו שם שהיו בקלט עצמו
+    return len(header) - 1 - list(reversed(header)).index(name)
+
+
+def _load_previous(
+    path: str,
+    *,
+    delimiter: str,
+    address_column: Optional[str],
+    key_column: Optional[str],
+) -> tuple[dict[bytes, tuple[float, float, bool]], dict[str, bytes]]:
+    """קורא פלט קודם של ``geocode_csv``.
+
+    מחזיר (נקודות לפי hash של כתובת, hash של כתובת לפי מזהה שורה). מזהה
+    השורה הוא ערך ``key_column`` אם ניתן, ואחרת מספר השורה.
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None) or []
+        try:
+            lat_index, lon_index = _last_index(header, "lat"), _last_index(header, "lon")
+        except ValueError as exc:
+            raise ValueError(f"בקובץ הקודם חסרות העמודות lat/lon: {header}") from exc
+        # אותה בחירה כמו ב-geocode_csv; קלט בלי כותרת נכתב עם הכתובת בעמודה הראשונה
+        addr_index = _address_column_index(header, address_column if address_column in header else None)
+        key_index = header.index(key_column) if key_column and key_column in header else None
+        interp_index = _last_index(header, "interpolated") if "interpolated" in header else None
+
+        points: dict[bytes, tuple[float, float, bool]] = {}
+        identities: dict[str, bytes] = {}
+        for i, row in enumerate(reader):
+            if len(row) <= max(addr_index, lat_index, lon_index):
+                continue
+            digest = _address_hash(row[addr_index])
+            identities[row[key_index] if key_index is not None and key_index < len(row) else str(i)] = digest
+            try:
+                lat, lon = float(row[lat_index]), float(row[lon_index])
+            except ValueError:
+                # שורה שלא נמצאה בפעם הקודמת — ננסה שוב
+                continue
+            interp = interp_index is not None and interp_index < len(row) and row[interp_index] == "1"
+            points[digest] = (lat, lon, interp)
+    return points, identities
+
+
 def geocode_csv(
     in_path: str,
     out_path: str,
@@ -133,7 +644,18 @@ def geocode_csv(
     address_column: Optional[str] = None,
     delimiter: str = ",",
     locator: Optional[Locator] = None,
-) -> None:
+    interpolate: bool = False,
+    anchors_per_street: int = 3,
+    previous_path: Optional[str] = None,
+    key_column: Optional[str] = None,
+) -> Optional[RefreshSummary]:
+    """מגאוקד קובץ CSV וכותב אותו עם עמודות הקואורדינטות.
+
+    עם ``previous_path`` (קובץ פלט קודם) שורות שהכתובת שלהן לא השתנתה
+    מקבלות את הנקודה מהקובץ הקודם, ורק כתובות חדשות או שהשתנו נשלחות
+    לגאוקודינג. במקרה זה מוחזר ``RefreshSummary``; השוואת השורות נעשית
+    לפי ``key_column`` אם ניתן, אחרת לפי מיקום השורה.
+    """
     loc = locator or _default_locator()
 
     with open(in_path, "r", encoding="utf-8-sig", newline="") as f_in:
@@ -149,40 +671,84 @@ def geocode_csv(
         if has_header:
             header = next(reader, None)  # type: ignore[assignment]
 
-        addr_index = 0
-        if address_column and header:
-            try:
-                addr_index = list(header).index(address_column)
-            except ValueError as exc:
-                raise ValueError(
-                    f"העמודה '{address_column}' לא נמצאה בכותרת: {header}"
-                ) from exc
+        addr_index = _address_column_index(header, address_column)
 
         rows = list(reader)
         addresses = [row[addr_index] if row else "" for row in rows]
 
-    results = geocode_addresses(addresses, locator=loc)
+    summary: Optional[RefreshSummary] = None
+    if previous_path is None:
+        results = geocode_addresses(
+            addresses, locator=loc, interpolate=interpolate, anchors_per_street=anchors_per_street
+        )
+    else:
+        previous, previous_ids = _load_previous(
+            previous_path, delimiter=delimiter, address_column=address_column, key_column=key_column
+        )
+        key_index = None
+        if key_column and header and key_column in header:
+            key_index = list(header).index(key_column)
+        hashes = [_address_hash(a) for a in addresses]
+
+        results = GeocodeBatch.empty(addresses)
+        pending: dict[bytes, list[int]] = {}
+        for i, digest in enumerate(hashes):
+            point = previous.get(digest)
+            if point is None:
+                pending.setdefault(digest, []).append(i)
+            else:
+                results.set(i, point[:2], interpolated=point[2])
+
+        # כל כתובת חדשה נשלחת פעם אחת, גם אם היא מופיעה בכמה שורות
+        todo = [indices[0] for indices in pending.values()]
+        fresh = geocode_addresses(
+            [addresses[i] for i in todo],
+            locator=loc,
+            interpolate=interpolate,
+            anchors_per_street=anchors_per_street,
+        )
+        for first, res in zip(todo, fresh):
+            for i in pending[hashes[first]]:
+                coords = (res.lat, res.lon) if res.lat is not None and res.lon is not None else None
+                results.set(i, coords, interpolated=res.interpolated)
+
+        current_ids = {
+            (rows[i][key_index] if key_index is not None and key_index < len(rows[i]) else str(i)): digest
+            for i, digest in enumerate(hashes)
+        }
+        common = current_ids.keys() & previous_ids.keys()
+        changed = sum(1 for k in common if current_ids[k] != previous_ids[k])
+        summary = RefreshSummary(
+            added=len(current_ids.keys() - previous_ids.keys()),
+            changed=changed,
+            removed=len(previous_ids.keys() - current_ids.keys()),
+            unchanged=len(common) - changed,
+            reused=len(addresses) - sum(len(v) for v in pending.values()),
+            geocoded=len(todo),
+        )
 
     with open(out_path, "w", encoding="utf-8", newline="") as f_out:
         writer = csv.writer(f_out, delimiter=delimiter)
         extra_cols = ["lat", "lon", "lat_ddm", "lon_ddm", "lat_dms", "lon_dms"]
+        if interpolate:
+            extra_cols.append("interpolated")
         if header:
             writer.writerow([*header, *extra_cols])
-            for row, res in zip(rows, results):
-                lat = res.lat
-                lon = res.lon
-                ddm_lat = _deg_to_ddm(lat, is_lat=True) if lat is not None else ""
-                ddm_lon = _deg_to_ddm(lon, is_lat=False) if lon is not None else ""
-                dms_lat = _deg_to_dms(lat, is_lat=True) if lat is not None else ""
-                dms_lon = _deg_to_dms(lon, is_lat=False) if lon is not None else ""
-                writer.writerow([*row, lat, lon, ddm_lat, ddm_lon, dms_lat, dms_lon])
+            for row, (lat, lon, formatted), status in zip(
+                rows, results.coordinate_columns(), results.status
+            ):
+                out_row = [*row, lat, lon, *formatted]
+                if interpolate:
+                    out_row.append(int(status == STATUS_INTERPOLATED))
+                writer.writerow(out_row)
         else:
             writer.writerow(["address", *extra_cols])
-            for res in results:
-                lat = res.lat
-                lon = res.lon
-                ddm_lat = _deg_to_ddm(lat, is_lat=True) if lat is not None else ""
-                ddm_lon = _deg_to_ddm(lon, is_lat=False) if lon is not None else ""
-                dms_lat = _deg_to_dms(lat, is_lat=True) if lat is not None else ""
-                dms_lon = _deg_to_dms(lon, is_lat=False) if lon is not None else ""
-                writer.writerow([res.address, lat, lon, ddm_lat, ddm_lon, dms_lat, dms_lon])
+            for address, (lat, lon, formatted), status in zip(
+                results.addresses, results.coordinate_columns(), results.status
+            ):
+                out_row = [address, lat, lon, *formatted]
+                if interpolate:
+                    out_row.append(int(status == STATUS_INTERPOLATED))
+                writer.writerow(out_row)
+
+    return summary
@@ -0,0 +1,175 @@
+"""מריץ עומס על ``itur.webapp``: העלאות ``/geocode`` והורדות ``/download`` במקביל.
+
+מדווח אחוזוני השהיה (p50/p95/p99) לכל נתיב, תפוקה, שגיאות, וזיכרון
+(RSS נוכחי ושיא) של תהליכי ה-worker שה-PID שלהם ניתן. מתאים להרצה מול
+שרת שמוגדר לעבוד מול ``itur.fakeprovider`` (ראו ``ITUR_NOMINATIM_URL``).
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Sequence
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+
+_UPLOAD_ID_RE = re.compile(r'name="upload_id" value="([0-9a-f]{32})"')
+
+_STREETS = ["הרצל", "ביאליק", "ויצמן", "רוטשילד", "ז'בוטינסקי", "בן גוריון", "סוקולוב", "אחד העם"]
+_CITIES = ["תל אביב", "רחובות", "חיפה", "ירושלים", "רמת גן", "כפר סבא", "נתניה", "באר שבע"]
+
+
+@dataclass
+class LoadTestConfig:
+    url: str = "http://127.0.0.1:8000"
+    concurrency: int = 8
+    jobs: int = 100
+    rows: int = 20
+    download_ratio: float = 0.5
+    timeout: float = 300.0
+    pids: Sequence[int] = ()
+
+
+@dataclass
+class LoadTestReport:
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+    rss_kb: dict[int, tuple[int, int]] = field(default_factory=dict)
+
+    def format(self) -> str:
+        lines = []
+        total = sum(len(v) for v in self.latencies.values())
+        lines.append(f"elapsed {self.elapsed:.2f}s, {total} requests, {total / max(self.elapsed, 1e-9):.2f} req/s")
+        for route, values in sorted(self.latencies.items()):
+            lines.append(
+                f"{route:10s} n={len(values):5d} errors={self.errors.get(route, 0):4d} "
+                f"p50={percentile(values, 50) * 1000:8.1f}ms "
+                f"p95={percentile(values, 95) * 1000:8.1f}ms "
+                f"p99={percentile(values, 99) * 1000:8.1f}ms"
+            )
+        for pid, (rss, peak) in sorted(self.rss_kb.items()):
+            lines.append(f"worker {pid}: rss={rss / 1024:.1f}MB peak={peak / 1024:.1f}MB")
+        return "\n".join(lines)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """אחוזון בשיטת nearest-rank; 0 לרשימה ריקה."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[min(len(ordered), int(rank)) - 1]
+
+
+def _read_rss_kb(pid: int) -> Optional[tuple[int, int]]:
+    """(VmRSS, VmHWM) בקילובייטים מ-/proc; None אם לא זמין (לא לינוקס / התהליך יצא)."""
+    try:
+        text = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return None
+    values = dict(re.findall(r"^(VmRSS|VmHWM):\s+(\d+) kB", text, re.MULTILINE))
+    if "VmRSS" not in values:
+        return None
+    return int(values["VmRSS"]), int(values.get("VmHWM", values["VmRSS"]))
+
+
+def sample_csv(rows: int, rng: random.Random) -> bytes:
+    lines = ["address"]
+    for _ in range(rows):
+        street, city = rng.choice(_STREETS), rng.choice(_CITIES)
+        lines.append(f'"{street} {rng.randint(1, 120)}, {city}"')
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _multipart(fields: dict[str, str], file_field: str, filename: str, content: bytes) -> tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        )
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f"Content-Type: text/csv\r\n\r\n".encode("utf-8")
+        + content
+        + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def _post(url: str, body: bytes, content_type: str, timeout: float) -> tuple[int, bytes]:
+    request = urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": content_type})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+
+
+def run_load_test(config: LoadTestConfig) -> LoadTestReport:
+    report = LoadTestReport(latencies={"/geocode": [], "/download": []})
+    lock = threading.Lock()
+    base = config.url.rstrip("/")
+
+    def record(route: str, seconds: float, ok: bool) -> None:
+        with lock:
+            report.latencies.setdefault(route, []).append(seconds)
+            if not ok:
+                report.errors[route] = report.errors.get(route, 0) + 1
+
+    def job(index: int) -> None:
+        rng = random.Random(index)
+        body, content_type = _multipart(
+            {"address_column": "address", "delimiter": ","}, "file", "load.csv", sample_csv(config.rows, rng)
+        )
+        start = time.perf_counter()
+        try:
+            status, payload = _post(f"{base}/geocode", body, content_type, config.timeout)
+        except OSError:
+            record("/geocode", time.perf_counter() - start, False)
+            return
+        record("/geocode", time.perf_counter() - start, status == 200)
+        match = _UPLOAD_ID_RE.search(payload.decode("utf-8", errors="replace"))
+        if status != 200 or not match or rng.random() >= config.download_ratio:
+            return
+        form = urllib.parse.urlencode(
+            {"upload_id": match.group(1), "delimiter": ",", "address_column": "address", "has_header": "true"}
+        ).encode("ascii")
+        start = time.perf_counter()
+        try:
+            status, _ = _post(f"{base}/download", form, "application/x-www-form-urlencoded", config.timeout)
+        except OSError:
+            status = 0
+        record("/download", time.perf_counter() - start, status == 200)
+
+    done = threading.Event()
+
+    def sample_memory() -> None:
+        while True:
+            for pid in config.pids:
+                rss = _read_rss_kb(pid)
+                if rss is not None:
+                    prev = report.rss_kb.get(pid, (0, 0))
+                    report.rss_kb[pid] = (rss[0], max(prev[1], rss[1]))
+            if done.wait(0.5):
+                return
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config.concurrency) as pool:
+        list(pool.map(job, range(config.jobs)))
+    report.elapsed = time.perf_counter() - started
+    done.set()
+    sampler.join()
+    return report
@@ -0,0 +1,153 @@
+"""טבלת יישובים מובנית: נקודת מרכז לכל יישוב, עם שמות חלופיים.
+
+כתובות של "עיר בלבד" או "עיר + מספר" נענות מהטבלה בלי קריאה לספק.
+הטבלה נטענת בעצלות, בקריאה הראשונה, לאינדקס dict לפי שם מנורמל (כך
+ש"מודיעין-מכבים-רעות", "מודיעין מכבים רעות" ו"מודיעין" מגיעים לאותה
+רשומה). ``itur localities`` מרענן את הטבלה וכותב אותה למטמון המשתמש,
+שגובר על הטבלה שמגיעה עם החבילה.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+import csv
+import os
+import re
+import threading
+
+from .geocode import _cache_dir
+
+PACKAGED_TABLE = Path(__file__).resolve().parent / "data" / "localities.csv"
+FIELDS = ["name", "lat", "lon", "aliases"]
+
+_SEPARATORS_RE = re.compile(r"[-־–—_/]+")
+_QUOTES_RE = re.compile(r"[\"'`׳״]")
+_SPELLINGS = {"קריית": "קרית"}
+
+
+def normalize_locality(name: str) -> str:
+    """מפתח השוואה: בלי מקפים וגרשיים, רווחים מאוחדים, כתיב אחיד."""
+    text = _QUOTES_RE.sub("", _SEPARATORS_RE.sub(" ", name.casefold()))
+    return " ".join(_SPELLINGS.get(word, word) for word in text.split())
+
+
+def user_table() -> Path:
+    return _cache_dir() / "localities.csv"
+
+
+def _read_rows(path: Path) -> list[dict[str, str]]:
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        return [row for row in csv.DictReader(f) if (row.get("name") or "").strip()]
+
+
+def _aliases(row: dict[str, str]) -> list[str]:
+    return [a.strip() for a in (row.get("aliases") or "").split("|") if a.strip()]
+
+
+class LocalityIndex:
+    def __init__(self, path: Optional[str | Path] = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._index: Optional[dict[str, tuple[float, float]]] = None
+
+    def _source(self) -> Path:
+        if self.path is not None:
+            return self.path
+        user = user_table()
+        return user if user.exists() else PACKAGED_TABLE
+
+    def load(self) -> int:
+        """טוען את הטבלה (פעם אחת) ומחזיר את מספר השמות באינדקס."""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = self._build()
+        return len(self._index)
+
+    def _build(self) -> dict[str, tuple[float, float]]:
+        index: dict[str, tuple[float, float]] = {}
+        try:
+            rows = _read_rows(self._source())
+        except OSError:
+            return index
+        aliases: list[tuple[str, tuple[float, float]]] = []
+        for row in rows:
+            try:
+                point = (float(row["lat"]), float(row["lon"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            index[normalize_locality(row["name"])] = point
+            aliases.extend((alias, point) for alias in _aliases(row))
+        # שם רשמי של יישוב אחד גובר על שם חלופי של יישוב אחר
+        for alias, point in aliases:
+            index.setdefault(normalize_locality(alias), point)
+        return index
+
+    def get(self, name: str) -> Optional[tuple[float, float]]:
+        self.load()
+        assert self._index is not None
+        return self._index.get(normalize_locality(name))
+
+    def __len__(self) -> int:
+        return self.load()
+
+
+_default: Optional[LocalityIndex] = None
+
+
+def default_localities() -> LocalityIndex:
+    """האינדקס המשותף לתהליך (עדיין לא טעון — נטען בשימוש הראשון)."""
+    global _default
+    if _default is None:
+        _default = LocalityIndex()
+    return _default
+
+
+def refresh_localities(
+    out_path: Optional[str | Path] = None,
+    *,
+    source: Optional[str | Path] = None,
+    geocode: Optional[Callable[[str], Optional[tuple[float, float]]]] = None,
+    base: Optional[str | Path] = None,
+) -> int:
+    """בונה טבלה מעודכנת וכותב אותה ל-``out_path`` (ברירת מחדל: מטמון המשתמש).
+
+    מתחילים מהטבלה הנוכחית (``base``), ממזגים יישובים מ-``source`` (CSV עם
+    עמודת ``name`` ואופציונלית ``lat``, ``lon``, ``aliases``), ואם ניתן
+    ``geocode`` — מחשבים מחדש את נקודת המרכז של כל יישוב. יישוב שהספק לא
+    מצא שומר על הנקודה הקודמת; יישוב בלי נקודה כלל לא נכתב. מחזיר את מספר
+    היישובים שנכתבו.
+    """
+    out = Path(out_path) if out_path is not None else user_table()
+    current = Path(base) if base is not None else LocalityIndex()._source()
+    table: dict[str, dict[str, str]] = {}
+    for path in (current, Path(source) if source is not None else None):
+        if path is None or not path.exists():
+            continue
+        for row in _read_rows(path):
+            key = normalize_locality(row["name"])
+            merged = table.setdefault(key, {"name": row["name"].strip(), "lat": "", "lon": "", "aliases": ""})
+            if (row.get("lat") or "").strip() and (row.get("lon") or "").strip():
+                merged["lat"], merged["lon"] = row["lat"].strip(), row["lon"].strip()
+            merged["aliases"] = "|".join(dict.fromkeys(_aliases(merged) + _aliases(row)))
+
+    if geocode is not None:
+        for row in table.values():
+            point = geocode(row["name"])
+            if point is not None:
+                row["lat"], row["lon"] = f"{point[0]:.5f}", f"{point[1]:.5f}"
+
+    rows = [row for row in table.values() if row["lat"] and row["lon"]]
+    _write_rows(out, rows)
+    return len(rows)
+
+
+def _write_rows(path: Path, rows: Iterable[dict[str, str]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
@@ -0,0 +1,204 @@
+"""בקרת קצב מסתגלת (AIMD) לקריאות לספקי גאוקודינג.
+
+לכל ספק יש ``AdaptiveRateController`` אחד בתהליך (``rate_controller``),
+שמשותף לכל הקריאות שבדרך. הקצב עולה בהדרגה (חיבורית) כל עוד הקריאות
+מצליחות, ויורד בחדות (כפלית) על 429 / חריגת מכסה / ``OVER_QUERY_LIMIT``,
+ובמתינות כשההשהיה הממוצעת עוברת את היעד. כך הקצב מתייצב ליד הגבול
+האמיתי של הספק בלי לבזבז מכסה ובלי להיחסם. ``rate_snapshot`` מחזיר את
+הקצב הנוכחי של כל ספק לניטור.
+
+כשכמה קריאות ממתינות לתור השליחה, הבקר בוחר לפי ``provider_gate`` — שער
+ההוגנות של העבודה שבהקשר הנוכחי (ראו ``JobTicket.locator``). ההמתנה היא
+רק לשליחה עצמה: תשובות מקומיות (טבלת היישובים, מאגר הרחובות) לא עוברות
+כאן בכלל.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, Protocol, TypeVar
+import itertools
+import threading
+import time
+
+T = TypeVar("T")
+
+
+class ProviderGate(Protocol):
+    def priority(self) -> tuple[int, ...]:
+        """מפתח עדיפות; הנמוך ביותר נשלח ראשון."""
+
+    def sent(self) -> None:
+        """נקרא כשהקריאה קיבלה את תורה לשליחה."""
+
+
+provider_gate: ContextVar[Optional[ProviderGate]] = ContextVar("itur_provider_gate", default=None)
+
+_THROTTLE_NAMES = ("RateLimited", "QuotaExceeded", "OverQueryLimit", "TooManyRequests")
+_TRANSIENT_NAMES = ("Timeout", "TimedOut", "Unavailable", "ServiceError", "TransportError")
+
+
+def _is_throttle(exc: BaseException) -> bool:
+    name = type(exc).__name__
+    if any(part in name for part in _THROTTLE_NAMES):
+        return True
+    status = getattr(exc, "status", None) or getattr(exc, "status_code", None)
+    return status in (429, "OVER_QUERY_LIMIT", "OVER_DAILY_LIMIT")
+
+
+def _is_transient(exc: BaseException) -> bool:
+    name = type(exc).__name__
+    return any(part in name for part in _TRANSIENT_NAMES)
+
+
+class AdaptiveRateController:
+    def __init__(
+        self,
+        name: str,
+        *,
+        initial_rate: float = 1.0,
+        min_rate: float = 0.05,
+        max_rate: float = 50.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        target_latency: float = 2.0,
+    ) -> None:
+        self.name = name
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self._rate = min(max(initial_rate, min_rate), max_rate)
+        self._lock = threading.Condition()
+        self._next_at = 0.0
+        self._seq = itertools.count()
+        self._waiting: list[tuple[int, Optional[ProviderGate]]] = []
+        self._latency: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self.successes = 0
+        self.throttles = 0
+        self.errors = 0
+
+    @property
+    def rate(self) -> float:
+        """קצב נוכחי, בקריאות לשנייה."""
+        with self._lock:
+            return self._rate
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "rate": round(self._rate, 4),
+                "latency": None if self._latency is None else round(self._latency, 4),
+                "successes": self.successes,
+                "throttles": self.throttles,
+                "errors": self.errors,
+                "waiting": len(self._waiting),
+            }
+
+    def _next_in_line(self) -> tuple[int, Optional[ProviderGate]]:
+        # קריאות בלי שער (CLI, Streamlit) — לפי סדר הגעה; עם שער — לפי העדיפות שלו
+        return min(
+            self._waiting,
+            key=lambda entry: ((0, 0) if entry[1] is None else entry[1].priority(), entry[0]),
+        )
+
+    def acquire(self, gate: Optional[ProviderGate] = None) -> None:
+        """ממתין עד שמותר לשלוח את הקריאה הבאה לפי הקצב הנוכחי, ולפי ``gate`` בין הממתינים."""
+        with self._lock:
+            entry = (next(self._seq), gate)
+            self._waiting.append(entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._next_in_line() is not entry:
+                        self._lock.wait()
+                    elif now < self._next_at:
+                        self._lock.wait(self._next_at - now)
+                    else:
+                        break
+            finally:
+                self._waiting.remove(entry)
+                self._lock.notify_all()
+            self._next_at = max(now, self._next_at) + 1.0 / self._rate
+            if gate is not None:
+                gate.sent()
+
+    def on_success(self, latency: float) -> None:
+        with self._lock:
+            self.successes += 1
+            self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+            if self._latency > self.target_latency:
+                # הספק מאט — ירידה מתונה, לכל היותר פעם בשנייה
+                self._decrease(0.9)
+                return
+            # עלייה חיבורית: בערך +increase קריאות/שנייה על כל שנייה של הצלחות
+            self._rate = min(self.max_rate, self._rate + self.increase / max(self._rate, 1.0))
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            self.throttles += 1
+            self._decrease(self.decrease)
+            if retry_after:
+                self._next_at = max(self._next_at, time.monotonic() + float(retry_after))
+            self._lock.notify_all()
+
+    def on_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        # כמה קריאות שנחסמו יחד הן אירוע אחד — לא מכווצים את הקצב פעמיים ברצף
+        if now - self._last_decrease < 1.0 / self._rate:
+            return
+        self._last_decrease = now
+        self._rate = max(self.min_rate, self._rate * factor)
+
+    def call(self, func: Callable[..., T], *args: Any, max_retries: int = 2, **kwargs: Any) -> T:
+        """קורא ל-``func`` בקצב המבוקר, ומנסה שוב אחרי חסימה או תקלה זמנית."""
+        gate = provider_gate.get()
+        for attempt in range(max_retries + 1):
+            self.acquire(gate)
+            started = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as exc:
+                if _is_throttle(exc):
+                    self.on_throttle(getattr(exc, "retry_after", None))
+                else:
+                    self.on_error()
+                    if not _is_transient(exc):
+                        raise
+                if attempt == max_retries:
+                    raise
+                continue
+            self.on_success(time.monotonic() - started)
+            return result
+        raise AssertionError("unreachable")
+
+    def wrap(self, func: Callable[..., T], *, max_retries: int = 2) -> Callable[..., T]:
+        def limited(*args: Any, **kwargs: Any) -> T:
+            return self.call(func, *args, max_retries=max_retries, **kwargs)
+
+        return limited
+
+
+_controllers: dict[str, AdaptiveRateController] = {}
+_registry_lock = threading.Lock()
+
+
+def rate_controller(name: str, **kwargs: Any) -> AdaptiveRateController:
+    """הבקר המשותף של ספק ``name`` בתהליך; ``kwargs`` חלים רק ביצירה הראשונה."""
+    with _registry_lock:
+        controller = _controllers.get(name)
+        if controller is None:
+            controller = _controllers[name] = AdaptiveRateController(name, **kwargs)
+        return controller
+
+
+def rate_snapshot() -> dict[str, dict[str, Any]]:
+    with _registry_lock:
+        controllers = list(_controllers.values())
+    return {c.name: c.snapshot() for c in controllers}
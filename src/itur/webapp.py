@@ -1,30 +1,129 @@
 from __future__ import annotations
 
+import asyncio
+import codecs
 import csv
 import io
+import itertools
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import IO, Any, Iterable, Iterator, Optional, Sequence
 
-from fastapi import FastAPI, File, Form, UploadFile, Request
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from .geocode import geocode_addresses
+from .admission import AdmissionController, JobTicket, Overloaded
+from .geocode import Locator, _coordinate_columns, _default_locator, iter_geocode_addresses
+from .localities import default_localities
+from .ratecontrol import rate_snapshot
 
 
 BASE_DIR = Path(__file__).resolve().parent
 TEMPLATES_DIR = BASE_DIR / "templates"
 STATIC_DIR = BASE_DIR / "static"
 
-app = FastAPI(title="Itur Geocoder")
+# קבצים שהועלו נשמרים בדיסק (לא בזיכרון) עד להורדה, ונמחקים אחרי UPLOAD_TTL_SECONDS
+UPLOAD_DIR = Path(tempfile.gettempdir()) / "itur-uploads"
+UPLOAD_TTL_SECONDS = 3600
+UPLOAD_SWEEP_INTERVAL_SECONDS = 300
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+PREVIEW_ROWS = 100
+_COPY_CHUNK = 1024 * 1024
+_UPLOAD_ID_RE = re.compile(r"[0-9a-f]{32}")
+# גודל מרבי לפריט JSON בודד בגוף בקשת ה-API; שומר על זיכרון חסום גם בקלט שבור
+API_MAX_ITEM_CHARS = 64 * 1024
+
+# בקרת כניסה: עבודות פעילות בסך הכול / לכל לקוח, ותור המתנה חסום
+MAX_ACTIVE_JOBS = 8
+MAX_JOBS_PER_CLIENT = 2
+MAX_QUEUED_JOBS = 16
+QUEUE_TIMEOUT_SECONDS = 30.0
+# כמה פרוקסי מהימנים יושבים לפני השרת (ב-Cloud Run: 1). כל אחד מוסיף ערך
+# אחד מימין ל-X-Forwarded-For; כל מה שמשמאל להם נשלט בידי הלקוח
+TRUSTED_PROXY_HOPS = int(os.environ.get("ITUR_TRUSTED_PROXY_HOPS", "0"))
+
+admission = AdmissionController(
+    max_jobs=MAX_ACTIVE_JOBS,
+    max_jobs_per_client=MAX_JOBS_PER_CLIENT,
+    max_queue=MAX_QUEUED_JOBS,
+    queue_timeout=QUEUE_TIMEOUT_SECONDS,
+)
+
+
+def _sweep_uploads() -> None:
+    cutoff = time.time() - UPLOAD_TTL_SECONDS
+    for path in UPLOAD_DIR.glob("*.csv"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def _warm_up() -> None:
+    # טבלת היישובים וההידור של התבניות — בעליית ה-worker ולא בבקשה הראשונה
+    default_localities().load()
+    for name in ("index.html", "results.html"):
+        templates.get_template(name)
+
+
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    # ניקוי תקופתי, כדי שגם מופע שאין בו תעבורה לא יצבור קבצים שפג תוקפם
+    async def sweep_forever() -> None:
+        while True:
+            await run_in_threadpool(_sweep_uploads)
+            await asyncio.sleep(UPLOAD_SWEEP_INTERVAL_SECONDS)
+
+    task = asyncio.create_task(sweep_forever())
+    await run_in_threadpool(_warm_up)
+    try:
+        yield
+    finally:
+        task.cancel()
+
+
+app = FastAPI(title="Itur Geocoder", lifespan=_lifespan)
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
 
+@app.middleware("http")
+async def _reject_oversized(request: Request, call_next):
+    # דחייה לפי Content-Length לפני שגוף ההעלאה נקרא בכלל
+    if request.method == "POST" and request.url.path == "/geocode":
+        try:
+            length = int(request.headers.get("content-length", "0"))
+        except ValueError:
+            length = 0
+        if length > MAX_UPLOAD_BYTES + _COPY_CHUNK:
+            return JSONResponse(
+                {"detail": f"הקובץ גדול מדי (מקסימום {MAX_UPLOAD_BYTES // (1024 * 1024)}MB)."},
+                status_code=413,
+            )
+    return await call_next(request)
+
+
+@lru_cache(maxsize=1)
+def _shared_locator() -> Locator:
+    # locator אחד לכל התהליך, כדי שמגביל הקצב ומטמון הרחובות יהיו משותפים לכל הבקשות
+    return _default_locator()
+
+
 @app.get("/")
 def index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
 
 
 def _sniff(sample: str) -> tuple[bool, str]:
@@ -36,6 +135,108 @@ def _sniff(sample: str) -> tuple[bool, str]:
         return False, ","
 
 
+def _spool_upload(src: IO[bytes]) -> str:
+    """מעתיק את ההעלאה לקובץ זמני בחתיכות ומחזיר מזהה להורדה.
+
+    העלאה שחורגת מ-``MAX_UPLOAD_BYTES`` נמחקת ונדחית ב-413.
+    """
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    _sweep_uploads()
+    upload_id = uuid.uuid4().hex
+    path = UPLOAD_DIR / f"{upload_id}.csv"
+    size = 0
+    with open(path, "wb") as dst:
+        while chunk := src.read(_COPY_CHUNK):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                break
+            dst.write(chunk)
+    if size > MAX_UPLOAD_BYTES:
+        path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=413, detail=f"הקובץ גדול מדי (מקסימום {MAX_UPLOAD_BYTES // (1024 * 1024)}MB)."
+        )
+    return upload_id
+
+
+def _upload_path(upload_id: str) -> Path:
+    path = UPLOAD_DIR / f"{upload_id}.csv"
+    if not _UPLOAD_ID_RE.fullmatch(upload_id) or not path.exists():
+        raise HTTPException(status_code=404, detail="הקובץ שהועלה לא נמצא או שפג תוקפו. העלה אותו מחדש.")
+    return path
+
+
+@contextmanager
+def _open_table(
+    path: Path, delimiter: str, has_header: bool
+) -> Iterator[tuple[Optional[list[str]], Iterator[list[str]]]]:
+    with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None) if has_header else None
+        yield header, reader
+
+
+def _address_index(header: Optional[Sequence[str]], address_column: Optional[str]) -> int:
+    if address_column and header:
+        try:
+            return list(header).index(address_column)
+        except ValueError:
+            return 0
+    return 0
+
+
+def _client_id(request: Request) -> str:
+    peer = request.client.host if request.client else "unknown"
+    if TRUSTED_PROXY_HOPS <= 0:
+        return peer
+    entries = [
+        entry.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for entry in header.split(",")
+        if entry.strip()
+    ]
+    if not entries:
+        return peer
+    # הכתובת שהפרוקסי המהימן החיצוני ביותר ראה — הערך ה-N מימין
+    return entries[max(0, len(entries) - TRUSTED_PROXY_HOPS)]
+
+
+async def _admit(request: Request) -> JobTicket:
+    """מקבל את הבקשה כעבודה, או עונה מיד 429 עם מיקום בתור ו-Retry-After."""
+    try:
+        return await run_in_threadpool(admission.admit, _client_id(request))
+    except Overloaded as exc:
+        raise HTTPException(
+            status_code=429,
+            detail={"detail": exc.reason, "queue_position": exc.queue_position, **admission.snapshot()},
+            headers={"Retry-After": str(exc.retry_after), "X-Queue-Position": str(exc.queue_position)},
+        ) from None
+
+
+def _release_when_done(chunks: Iterable[Any], ticket: JobTicket) -> Iterator[Any]:
+    # העבודה משתחררת בסוף השידור, או כשהלקוח מתנתק והאיטרטור נסגר
+    try:
+        yield from chunks
+    finally:
+        ticket.release()
+
+
+def _geocoded_rows(
+    rows: Iterator[list[str]], addr_index: int, ticket: JobTicket
+) -> Iterator[tuple[list[str], Optional[float], Optional[float]]]:
+    """מגאוקד שורה אחר שורה; רק השורה הנוכחית מוחזקת בזיכרון."""
+    pending: deque[list[str]] = deque()
+
+    def addresses() -> Iterator[str]:
+        for row in rows:
+            pending.append(row)
+            yield row[addr_index] if len(row) > addr_index else ""
+
+    locator = ticket.locator(_shared_locator())
+    for res in iter_geocode_addresses(addresses(), locator=locator):
+        yield pending.popleft(), res.lat, res.lon
+
+
 @app.post("/geocode")
 async def geocode_route(
     request: Request,
@@ -43,107 +244,268 @@ async def geocode_route(
     address_column: Optional[str] = Form(None),
     delimiter: str = Form(","),
 ):
-    raw = await file.read()
-    text = raw.decode("utf-8-sig", errors="replace")
-    sample = text[:2048]
+    ticket = await _admit(request)
+    try:
+        return await _geocode_preview(request, ticket, file, address_column, delimiter)
+    except BaseException:
+        ticket.release()
+        raise
+
+
+async def _geocode_preview(
+    request: Request,
+    ticket: JobTicket,
+    file: UploadFile,
+    address_column: Optional[str],
+    delimiter: str,
+) -> StreamingResponse:
+    upload_id = await run_in_threadpool(_spool_upload, file.file)
+    path = _upload_path(upload_id)
 
+    with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+        sample = f.read(2048)
     has_header, sniff_delim = _sniff(sample)
     if delimiter == "auto":
         delimiter = sniff_delim
 
-    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
-    header = next(reader, None) if has_header else None
-    rows = list(reader) if header else list(csv.reader(io.StringIO(text), delimiter=delimiter))
+    def _count() -> tuple[Optional[list[str]], int]:
+        with _open_table(path, delimiter, has_header) as (header, reader):
+            return header, sum(1 for _ in reader)
 
-    addr_index = 0
-    if address_column and header:
-        try:
-            addr_index = list(header).index(address_column)
-        except ValueError:
-            addr_index = 0
-
-    addresses = [row[addr_index] if row else "" for row in rows]
-    results = geocode_addresses(addresses)
-
-    # הכנת תצוגה מקדימה (עד 100 שורות)
-    def _ddm(lat, lon):
-        from .geocode import _deg_to_ddm as ddm, _deg_to_dms as dms
-        def fmt(v, is_lat):
-            return ddm(v, is_lat=is_lat) if v is not None else ""
-        def fmt2(v, is_lat):
-            return dms(v, is_lat=is_lat) if v is not None else ""
-        return (
-            fmt(lat, True), fmt(lon, False),
-            fmt2(lat, True), fmt2(lon, False)
-        )
+    header, count = await run_in_threadpool(_count)
+    addr_index = _address_index(header, address_column)
 
     extra_cols = ["lat", "lon", "lat_ddm", "lon_ddm", "lat_dms", "lon_dms"]
-    if header:
-        preview_header = [*header, *extra_cols]
-        preview_rows = []
-        for row, r in zip(rows, results):
-            lat, lon = r.lat, r.lon
-            lat_ddm, lon_ddm, lat_dms, lon_dms = _ddm(lat, lon)
-            preview_rows.append([*row, lat, lon, lat_ddm, lon_ddm, lat_dms, lon_dms])
-        preview_rows = preview_rows[:100]
-    else:
-        preview_header = ["address", *extra_cols]
-        preview_rows = []
-        for r in results[:100]:
-            lat, lon = r.lat, r.lon
-            lat_ddm, lon_ddm, lat_dms, lon_dms = _ddm(lat, lon)
-            preview_rows.append([r.address, lat, lon, lat_ddm, lon_ddm, lat_dms, lon_dms])
-
-    return templates.TemplateResponse(
-        "results.html",
-        {
-            "request": request,
-            "header": preview_header,
-            "rows": preview_rows,
-            "count": len(results),
-            "delimiter": delimiter,
-            "address_column": address_column or "",
-            "raw_text": text,
-            "has_header": has_header,
-        },
+    preview_header = [*header, *extra_cols] if header else ["address", *extra_cols]
+
+    # תצוגה מקדימה (עד 100 שורות) — כל שורה נשלחת לדפדפן מיד כשהיא מגאוקדת
+    def preview_rows() -> Iterator[list]:
+        with _open_table(path, delimiter, has_header) as (_, reader):
+            head = itertools.islice(reader, PREVIEW_ROWS)
+            for row, lat, lon in _geocoded_rows(head, addr_index, ticket):
+                prefix = row if header else [row[addr_index] if len(row) > addr_index else ""]
+                yield [*prefix, lat, lon, *_coordinate_columns(lat, lon)]
+
+    template = templates.get_template("results.html")
+    stream = template.generate(
+        request=request,
+        header=preview_header,
+        rows=preview_rows(),
+        count=count,
+        delimiter=delimiter,
+        address_column=address_column or "",
+        upload_id=upload_id,
+        has_header=has_header,
     )
+    return StreamingResponse(_release_when_done(stream, ticket), media_type="text/html; charset=utf-8")
 
 
 @app.post("/download")
 async def download_csv(
-    raw_text: str = Form(...),
+    request: Request,
+    upload_id: str = Form(...),
     delimiter: str = Form(","),
     address_column: str = Form(""),
     has_header: bool = Form(False),
 ):
-    text = raw_text
-    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
-    header = next(reader, None) if has_header else None
-    rows = list(reader) if header else list(csv.reader(io.StringIO(text), delimiter=delimiter))
+    path = _upload_path(upload_id)
+    await run_in_threadpool(_sweep_uploads)
+    ticket = await _admit(request)
 
-    addr_index = 0
-    if address_column and header:
+    def generate():
+        with _open_table(path, delimiter, has_header) as (header, reader):
+            addr_index = _address_index(header, address_column)
+            out = io.StringIO()
+            writer = csv.writer(out, delimiter=delimiter)
+            if header:
+                writer.writerow([*header, "lat", "lon"])
+            for row, lat, lon in _geocoded_rows(reader, addr_index, ticket):
+                if header:
+                    writer.writerow([*row, lat, lon])
+                else:
+                    writer.writerow([row[addr_index] if len(row) > addr_index else "", lat, lon])
+                yield out.getvalue()
+                out.seek(0)
+                out.truncate()
+
+    return StreamingResponse(_release_when_done(generate(), ticket), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=geocoded.csv"})
+
+
+class _JsonItemParser:
+    """מפענח הדרגתי לגוף בקשה שהוא מערך JSON או NDJSON (ערך JSON בכל שורה).
+
+    ``feed`` מקבל טקסט כפי שהגיע מהרשת ומניב את הפריטים שהושלמו; פריט
+    שנחתך באמצע ממתין לחתיכה הבאה. קלט שבור מעלה ``ValueError`` רק אחרי
+    שכל הפריטים התקינים שלפניו הונבו. יש לצרוך כל איטרטור עד סופו לפני הבא.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._array: Optional[bool] = None
+        self._closed = False
+        # מצב המפרידים: במערך — בדיוק פסיק אחד בין פריטים; ב-NDJSON — שורה חדשה בין ערכים
+        self._after_value = False
+        self._after_comma = False
+
+    def feed(self, text: str) -> Iterator[Any]:
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        if self._array is None and self._buf.startswith("\ufeff"):
+            # BOM בתחילת הגוף (למשל קובץ שנכתב ב-PowerShell)
+            self._buf = self._buf[1:]
+        return self._parse(final=False)
+
+    def close(self) -> Iterator[Any]:
+        yield from self._parse(final=True)
+        if self._array and not self._closed:
+            raise ValueError("מערך ה-JSON לא נסגר")
+
+    def _parse(self, *, final: bool) -> Iterator[Any]:
+        buf = self._buf
+        while True:
+            pos = self._pos
+            while pos < len(buf) and buf[pos].isspace():
+                if buf[pos] == "\n" and not self._array:
+                    self._after_value = False
+                pos += 1
+            self._pos = pos
+            if pos == len(buf):
+                return
+            if self._closed:
+                raise ValueError(f"תוכן לא צפוי אחרי סוף מערך ה-JSON בתו {pos}")
+            if self._array is None:
+                self._array = buf[pos] == "["
+                if self._array:
+                    self._pos = pos + 1
+                    continue
+            if self._array and buf[pos] == "]":
+                if self._after_comma:
+                    raise ValueError(f"פסיק מיותר לפני סוף המערך בתו {pos}")
+                self._closed = True
+                self._pos = pos + 1
+                continue
+            if self._array and buf[pos] == ",":
+                if not self._after_value:
+                    raise ValueError(f"פסיק לא צפוי בתו {pos}")
+                self._after_value, self._after_comma = False, True
+                self._pos = pos + 1
+                continue
+            if self._after_value:
+                separator = "פסיק" if self._array else "שורה חדשה"
+                raise ValueError(f"חסר מפריד ({separator}) בין ערכים בתו {pos}")
+            try:
+                value, end = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if final or len(buf) - pos > API_MAX_ITEM_CHARS:
+                    raise ValueError(f"JSON לא תקין בתו {pos}") from None
+                return
+            if end == len(buf) and not final and not isinstance(value, (str, dict, list)):
+                # מספר/ליטרל בסוף החתיכה עשוי להיות חתוך — נמתין להמשך
+                return
+            self._pos = end
+            self._after_value, self._after_comma = True, False
+            yield value
+
+
+def _api_result(index: int, item: Any, locate: Locator) -> dict[str, Any]:
+    if isinstance(item, str):
+        row_id: Any = index
+        address: Any = item
+    elif isinstance(item, dict):
+        row_id = item.get("id", index)
+        address = item.get("address")
+    else:
+        row_id, address = index, None
+
+    out: dict[str, Any] = {"id": row_id, "address": address}
+    if not isinstance(address, str):
+        out["status"] = "invalid"
+        return out
+
+    coords = locate(address)
+    lat, lon = (coords if coords is not None else (None, None))
+    lat_ddm, lon_ddm, lat_dms, lon_dms = _coordinate_columns(lat, lon)
+    out.update(
+        lat=lat,
+        lon=lon,
+        lat_ddm=lat_ddm,
+        lon_ddm=lon_ddm,
+        lat_dms=lat_dms,
+        lon_dms=lon_dms,
+        status="ok" if coords is not None else "not_found",
+    )
+    return out
+
+
+def _ndjson(obj: dict[str, Any]) -> str:
+    return json.dumps(obj, ensure_ascii=False) + "\n"
+
+
+class _NdjsonGeocodeResponse(StreamingResponse):
+    """תשובת NDJSON שקוראת את גוף הבקשה בעצמה.
+
+    ``StreamingResponse`` רגיל מאזין ל-``receive()`` לזיהוי ניתוק במקביל
+    לגוף התשובה, ולכן אי אפשר לקרוא ממנו את גוף הבקשה תוך כדי שידור.
+    כאן משימה אחת מתאמת בין השניים: קוראים חתיכה, שולחים את התוצאות שלה,
+    ורק אז קוראים את החתיכה הבאה — כך הקלט נצרך בקצב שבו הלקוח קורא.
+    """
+
+    def __init__(self, ticket: JobTicket) -> None:
+        super().__init__(iter(()), media_type="application/x-ndjson")
+        self.ticket = ticket
+
+    async def __call__(self, scope, receive, send) -> None:
         try:
-            addr_index = list(header).index(address_column)
-        except ValueError:
-            addr_index = 0
+            await self._stream(receive, send)
+        finally:
+            self.ticket.release()
 
-    addresses = [row[addr_index] if row else "" for row in rows]
-    results = geocode_addresses(addresses)
+    async def _stream(self, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
 
-    def generate():
-        out = io.StringIO()
-        writer = csv.writer(out, delimiter=delimiter)
-        if header:
-            writer.writerow([*header, "lat", "lon"])
-            for row, res in zip(rows, results):
-                writer.writerow([*row, res.lat, res.lon])
-        else:
-            for res in results:
-                writer.writerow([res.address, res.lat, res.lon])
-        yield out.getvalue()
-
-    return StreamingResponse(generate(), media_type="text/csv", headers={"Content-Disposition": "attachment; filename=geocoded.csv"})
+        async def emit(obj: dict[str, Any]) -> None:
+            await send({"type": "http.response.body", "body": _ndjson(obj).encode("utf-8"), "more_body": True})
+
+        locate = self.ticket.locator(_shared_locator())
+        parser = _JsonItemParser()
+        text = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        index = 0
+        more_body = True
+        try:
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                more_body = message.get("more_body", False)
+                items = parser.feed(text.decode(message.get("body", b""), final=not more_body))
+                if not more_body:
+                    items = itertools.chain(items, parser.close())
+                for item in items:
+                    await emit(await run_in_threadpool(_api_result, index, item, locate))
+                    index += 1
+        except ValueError as exc:
+            # התשובה כבר בשידור — מדווחים על השגיאה כשורה אחרונה
+            await emit({"id": None, "status": "error", "detail": str(exc)})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+@app.post("/api/geocode")
+async def api_geocode(request: Request):
+    """גאוקודינג בכמויות: גוף הבקשה הוא מערך JSON או NDJSON של כתובות.
+
+    כל פריט הוא מחרוזת כתובת או אובייקט ``{"id": ..., "address": ...}``.
+    התשובה היא NDJSON בשידור chunked — שורה לכל פריט, בסדר הקלט, מיד כשהיא
+    מוכנה. הקלט נקרא רק בקצב שבו הלקוח קורא את התשובה.
+    """
+    return _NdjsonGeocodeResponse(await _admit(request))
+
+
+@app.get("/api/status")
+def api_status():
+    """מצב לניטור: עומס העבודות והקצב הנוכחי מול כל ספק."""
+    return {"admission": admission.snapshot(), "providers": rate_snapshot()}
 
 
 if __name__ == "__main__":
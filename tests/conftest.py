@@ -0,0 +1,13 @@
+import faulthandler
+
+import pytest
+
+# בדיקה שנתקעת (למשל בשידור תשובה) מפילה את הריצה עם traceback במקום לתקוע את ה-CI
+TEST_TIMEOUT_SECONDS = 60
+
+
+@pytest.fixture(autouse=True)
+def _test_timeout():
+    faulthandler.dump_traceback_later(TEST_TIMEOUT_SECONDS, exit=True)
+    yield
+    faulthandler.cancel_dump_traceback_later()
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+
+from itur.admission import AdmissionController, Overloaded
+from itur.ratecontrol import AdaptiveRateController
+
+
+def _wait_until(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def _hold(rate: AdaptiveRateController) -> None:
+    # אף שליחה לא מקבלת תור עד _resume
+    rate.on_throttle(retry_after=60)
+
+
+def _resume(rate: AdaptiveRateController) -> None:
+    with rate._lock:
+        rate._next_at = 0.0
+        rate._lock.notify_all()
+
+
+def test_per_client_limit_and_release() -> None:
+    controller = AdmissionController(max_jobs=4, max_jobs_per_client=1)
+    ticket = controller.admit("a")
+    with pytest.raises(Overloaded):
+        controller.admit("a", timeout=0)
+    other = controller.admit("b")
+    ticket.release()
+    ticket.release()
+    controller.admit("a").release()
+    other.release()
+    assert controller.snapshot()["active_jobs"] == 0
+
+
+def test_queue_full_is_rejected_immediately() -> None:
+    controller = AdmissionController(max_jobs=1, max_jobs_per_client=5, max_queue=0)
+    ticket = controller.admit("a")
+    started = time.monotonic()
+    with pytest.raises(Overloaded) as info:
+        controller.admit("b")
+    assert time.monotonic() - started < 1
+    assert info.value.queue_position == 1
+    ticket.release()
+
+
+def test_queued_job_starts_when_slot_frees() -> None:
+    controller = AdmissionController(max_jobs=1, max_jobs_per_client=5, max_queue=2)
+    first = controller.admit("a")
+    admitted = []
+    waiter = threading.Thread(target=lambda: admitted.append(controller.admit("b", timeout=5)))
+    waiter.start()
+    _wait_until(lambda: controller.snapshot()["queued_jobs"] == 1)
+    first.release()
+    waiter.join(5)
+    assert admitted and admitted[0].client == "b"
+    admitted[0].release()
+
+
+def test_provider_sends_favour_least_served_job() -> None:
+    controller = AdmissionController(max_jobs=4, max_jobs_per_client=4)
+    rate = AdaptiveRateController("fair", initial_rate=1000.0, max_rate=1000.0)
+    tickets = {name: controller.admit(name) for name in ("a", "b", "c")}
+    for name, served in (("a", 5), ("c", 2)):
+        for _ in range(served):
+            tickets[name].sent()
+    order: list[str] = []
+
+    def send(address: str):
+        order.append(address)
+        return None
+
+    _hold(rate)
+    threads = [
+        threading.Thread(target=ticket.locator(lambda addr: rate.call(send, addr)), args=(name,))
+        for name, ticket in tickets.items()
+    ]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: rate.snapshot()["waiting"] == 3)
+    _resume(rate)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["b", "c", "a"]
+    for ticket in tickets.values():
+        ticket.release()
+
+
+def test_local_answers_do_not_wait_for_provider() -> None:
+    controller = AdmissionController(max_jobs=4, max_jobs_per_client=4)
+    rate = AdaptiveRateController("local", initial_rate=1000.0, max_rate=1000.0)
+    busy, other = controller.admit("busy"), controller.admit("other")
+
+    def locate(address: str):
+        if address.startswith("local"):
+            return (32.0, 34.8)
+        return rate.call(lambda: None)
+
+    _hold(rate)
+    waiting = threading.Thread(target=busy.locator(locate), args=("remote",))
+    waiting.start()
+    _wait_until(lambda: rate.snapshot()["waiting"] == 1)
+    started = time.monotonic()
+    assert [other.locator(locate)(f"local{i}") for i in range(10)] == [(32.0, 34.8)] * 10
+    assert time.monotonic() - started < 1
+    _resume(rate)
+    waiting.join(5)
+    busy.release()
+    other.release()
+
+
+def test_provider_sends_from_different_jobs_overlap() -> None:
+    # הרשת לא מוגבלת לקריאה אחת בכל רגע — רק הקצב של הבקר
+    controller = AdmissionController(max_jobs=4, max_jobs_per_client=4)
+    rate = AdaptiveRateController("overlap", initial_rate=1000.0, max_rate=1000.0)
+    in_flight = threading.Barrier(2, timeout=5)
+
+    def locate(address: str):
+        return rate.call(in_flight.wait)
+
+    tickets = [controller.admit("a"), controller.admit("b")]
+    threads = [threading.Thread(target=t.locator(locate), args=("x",)) for t in tickets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert not in_flight.broken
+    assert rate.snapshot()["successes"] == 2
+    for ticket in tickets:
+        ticket.release()
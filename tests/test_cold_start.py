@@ -0,0 +1,37 @@
+from pathlib import Path
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _loaded_modules(code: str, cache_dir: Path, *modules: str) -> list[str]:
+    """מריץ קוד בתהליך חדש ומחזיר אילו מהמודולים נטענו בו."""
+    probe = f"{code}\nimport sys\nprint(','.join(m for m in {modules!r} if m in sys.modules))"
+    env = {**os.environ, "PYTHONPATH": str(ROOT / "src"), "ITUR_CACHE_DIR": str(cache_dir)}
+    out = subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, env=env, capture_output=True, text=True, check=True, timeout=60
+    ).stdout
+    return [m for m in out.strip().splitlines()[-1].split(",") if m] if out.strip() else []
+
+
+def test_cli_and_locator_defer_provider_imports(tmp_path: Path) -> None:
+    code = (
+        "import itur.__main__\n"
+        "from itur.geocode import StreetStartStore, _default_locator\n"
+        "_default_locator(street_store=StreetStartStore())('תל אביב')"
+    )
+    assert _loaded_modules(code, tmp_path, "geopy", "pandas") == []
+
+
+def test_webapp_import_defers_provider_imports(tmp_path: Path) -> None:
+    assert _loaded_modules("import itur.webapp", tmp_path, "geopy", "pandas") == []
+
+
+def test_streamlit_first_render_defers_heavy_imports(tmp_path: Path) -> None:
+    pytest.importorskip("streamlit")
+    code = f"import runpy\nrunpy.run_path({str(ROOT / 'app.py')!r})"
+    assert _loaded_modules(code, tmp_path, "pandas", "pydeck", "googlemaps") == []
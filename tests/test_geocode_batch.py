@@ -0,0 +1,37 @@
+import math
+
+import pytest
+
+from itur.geocode import STATUS_FOUND, STATUS_NOT_FOUND, GeocodeBatch, geocode_addresses
+
+
+def _fake_locator(addr: str):
+    if addr == "Tel Aviv":
+        return (32.0853, 34.7818)
+    return None
+
+
+def test_batch_columns_and_row_views() -> None:
+    batch = geocode_addresses(["Tel Aviv", "Nowhere", "Tel Aviv"], locator=_fake_locator)
+
+    assert isinstance(batch, GeocodeBatch)
+    assert len(batch) == 3
+    assert list(batch.status) == [STATUS_FOUND, STATUS_NOT_FOUND, STATUS_FOUND]
+    assert math.isnan(batch.lat[1])
+    assert batch.addresses[0] is batch.addresses[2]
+
+    assert batch[0].lat == 32.0853 and batch[0].lon == 34.7818
+    assert batch[-2].lat is None and batch[1].address == "Nowhere"
+    assert [r.address for r in batch[1:]] == ["Nowhere", "Tel Aviv"]
+    assert [r.lat for r in batch] == [32.0853, None, 32.0853]
+
+
+def test_batch_zero_copy_handoff() -> None:
+    np = pytest.importorskip("numpy")
+    batch = geocode_addresses(["Tel Aviv", "Nowhere"], locator=_fake_locator)
+
+    lat, lon, status = batch.to_numpy()
+    assert lat[0] == 32.0853 and np.isnan(lon[1])
+    assert list(status) == [STATUS_FOUND, STATUS_NOT_FOUND]
+    batch.lat[0] = 1.0
+    assert lat[0] == 1.0
@@ -0,0 +1,60 @@
+from itur.geocode import _parse_street_address, geocode_addresses
+
+
+def test_parse_street_address() -> None:
+    assert _parse_street_address("הרצל 40, רחובות") == ("רחובות", "הרצל", 40)
+    assert _parse_street_address("40 הרצל, רחובות") == ("רחובות", "הרצל", 40)
+    assert _parse_street_address("הרצל, רחובות") is None
+    assert _parse_street_address("12, רחובות") is None
+    assert _parse_street_address("רחובות") is None
+
+
+def test_interpolates_between_anchors() -> None:
+    calls: list[str] = []
+
+    def fake_locator(addr: str):
+        calls.append(addr)
+        number = int(addr.split(",")[0].split()[-1])
+        return (31.0 + number / 1000, 34.0 + number / 1000)
+
+    addresses = [f"הרצל {n}, רחובות" for n in range(1, 41)] + ["הרצל 1, רחובות"]
+    results = geocode_addresses(addresses, locator=fake_locator, interpolate=True, anchors_per_street=3)
+
+    # שלושה עוגנים לכל צד של הרחוב (זוגי / אי־זוגי)
+    assert len(calls) == 6
+    assert len(results) == len(addresses)
+    by_number = {int(r.address.split(",")[0].split()[-1]): r for r in results}
+    assert not by_number[1].interpolated and not by_number[40].interpolated
+    assert by_number[10].interpolated
+    assert abs(by_number[10].lat - 31.010) < 1e-9
+    assert results[-1].lat == results[0].lat
+
+
+def test_falls_back_to_exact_query_outside_anchors() -> None:
+    def fake_locator(addr: str):
+        if addr.startswith("הרצל 1,"):
+            return None
+        number = int(addr.split(",")[0].split()[-1])
+        return (31.0 + number / 1000, 34.0)
+
+    addresses = [f"הרצל {n}, רחובות" for n in (1, 3, 5, 9)]
+    results = geocode_addresses(addresses, locator=fake_locator, interpolate=True, anchors_per_street=2)
+
+    assert results[0].lat is None
+    assert results[1].lat == 31.003 and not results[1].interpolated
+    assert results[2].interpolated
+
+
+def test_interpolation_keeps_street_side() -> None:
+    def fake_locator(addr: str):
+        number = int(addr.split(",")[0].split()[-1])
+        side = 0.001 if number % 2 else -0.001
+        return (31.0 + number / 1000, 34.0 + side)
+
+    addresses = [f"הרצל {n}, רחובות" for n in (2, 10, 20, 3, 11, 21)]
+    results = geocode_addresses(addresses, locator=fake_locator, interpolate=True, anchors_per_street=2)
+
+    ten, eleven = results[1], results[4]
+    assert ten.interpolated and eleven.interpolated
+    assert abs(ten.lon - 33.999) < 1e-9
+    assert abs(eleven.lon - 34.001) < 1e-9
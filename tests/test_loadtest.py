@@ -0,0 +1,62 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from itur.fakeprovider import FakeProviderConfig, FakeProviderServer
+from itur.loadtest import percentile
+
+
+@pytest.fixture
+def provider():
+    servers = []
+
+    def start(**kwargs):
+        server = FakeProviderServer(config=FakeProviderConfig(latency_ms=0, jitter_ms=0, **kwargs))
+        server.start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _get(url: str):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_fake_provider_nominatim_and_google(provider) -> None:
+    server = provider(geojson_points=1000)
+
+    status, places = _get(f"{server.url}/search?q=Tel+Aviv&format=json")
+    assert status == 200 and len(places) == 1
+    assert _get(f"{server.url}/search?q=Tel+Aviv&format=json")[1][0]["lat"] == places[0]["lat"]
+
+    _, streets = _get(f"{server.url}/search?street=Herzl&city=Rehovot&polygon_geojson=1")
+    assert len(streets[0]["geojson"]["coordinates"]) == 1000
+
+    status, body = _get(f"{server.url}/maps/api/geocode/json?address=Tel+Aviv")
+    assert body["status"] == "OK"
+    assert set(body["results"][0]["geometry"]["location"]) == {"lat", "lng"}
+    assert server.requests == 4
+
+
+def test_fake_provider_throttles(provider) -> None:
+    server = provider(throttle_rate=1.0)
+    assert _get(f"{server.url}/search?q=x")[0] == 429
+    assert _get(f"{server.url}/maps/api/geocode/json?address=x")[1]["status"] == "OVER_QUERY_LIMIT"
+
+
+def test_percentile() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from itur.geocode import StreetStartStore, _default_locator
+from itur.localities import LocalityIndex, refresh_localities
+
+
+def test_packaged_table_matches_aliases_and_spellings() -> None:
+    towns = LocalityIndex(Path(__file__).resolve().parents[1] / "src" / "itur" / "data" / "localities.csv")
+    modiin = towns.get("מודיעין-מכבים-רעות")
+    assert modiin is not None
+    assert towns.get("מודיעין") == towns.get(" מודיעין מכבים  רעות") == modiin
+    assert towns.get("מודיעין עילית") not in (None, modiin)
+    assert towns.get("קרית אתא") == towns.get("קריית-אתא") is not None
+    assert towns.get('ת"א') == towns.get("תל אביב-יפו") is not None
+    assert towns.get("עיר שלא קיימת") is None
+
+
+def test_locator_answers_city_rows_without_fetching(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    table = tmp_path / "towns.csv"
+    table.write_text("name,lat,lon,aliases\nרחובות,31.9,34.8,Rehovot\n", encoding="utf-8")
+    monkeypatch.setenv("ITUR_CACHE_DIR", str(tmp_path / "cache"))
+    # כל פנייה לרשת הייתה נכשלת ומחזירה None
+    monkeypatch.setenv("ITUR_NOMINATIM_URL", "http://127.0.0.1:9")
+    locate = _default_locator(street_store=StreetStartStore(), localities=LocalityIndex(table))
+    assert locate("רחובות") == (31.9, 34.8)
+    assert locate("12, Rehovot") == (31.9, 34.8)
+
+
+def test_refresh_merges_source_and_overrides_packaged_table(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("ITUR_CACHE_DIR", str(tmp_path / "cache"))
+    base = tmp_path / "base.csv"
+    base.write_text("name,lat,lon,aliases\nרחובות,31.9,34.8,\nחולון,32.0,34.7,\n", encoding="utf-8")
+    source = tmp_path / "source.csv"
+    source.write_text("name,aliases\nרחובות,Rehovot\nיישוב חדש,חדש\nאין נקודה,\n", encoding="utf-8")
+    points = {"רחובות": (31.89, 34.81), "יישוב חדש": (30.5, 34.9)}
+
+    count = refresh_localities(source=source, geocode=points.get, base=base)
+
+    assert count == 3
+    towns = LocalityIndex()
+    assert towns.get("Rehovot") == (31.89, 34.81)
+    assert towns.get("חולון") == (32.0, 34.7)
+    assert towns.get("חדש") == (30.5, 34.9)
+    assert towns.get("אין נקודה") is None
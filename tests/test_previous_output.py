@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from itur.geocode import geocode_csv
+
+
+def _locator(calls: list[str]):
+    def locate(addr: str):
+        calls.append(addr)
+        if addr == "Nowhere":
+            return None
+        return (32.0 + len(addr) / 100, 34.0)
+
+    return locate
+
+
+def test_reuses_unchanged_rows(tmp_path: Path) -> None:
+    week1, week2 = tmp_path / "week1.csv", tmp_path / "week2.csv"
+    out1, out2 = tmp_path / "out1.csv", tmp_path / "out2.csv"
+    week1.write_text("id,address\n1,Tel Aviv\n2,Haifa\n3,Nowhere\n4,Eilat\n", encoding="utf-8")
+    week2.write_text(
+        "id,address\n1,Tel Aviv\n2,Akko\n3,Nowhere\n5,Haifa\n6,Tel Aviv\n", encoding="utf-8"
+    )
+
+    geocode_csv(str(week1), str(out1), address_column="address", locator=_locator([]))
+
+    calls: list[str] = []
+    summary = geocode_csv(
+        str(week2),
+        str(out2),
+        address_column="address",
+        locator=_locator(calls),
+        previous_path=str(out1),
+        key_column="id",
+    )
+
+    # Tel Aviv ו-Haifa נלקחים מהפלט הקודם; Nowhere לא נמצא בפעם הקודמת ולכן נשלח שוב
+    assert sorted(calls) == ["Akko", "Nowhere"]
+    assert summary is not None
+    assert (summary.added, summary.changed, summary.removed, summary.unchanged) == (2, 1, 1, 2)
+    assert (summary.reused, summary.geocoded) == (3, 2)
+
+    lines = out2.read_text(encoding="utf-8").strip().splitlines()
+    assert lines[1].startswith("1,Tel Aviv,32.08,34.0")
+    assert lines[2].startswith("2,Akko,32.04,34.0")
+    assert lines[4].startswith("5,Haifa,32.05,34.0")
+
+
+def test_previous_output_uses_same_address_column(tmp_path: Path) -> None:
+    # בלי --col הכתובת היא העמודה הראשונה, גם כשיש עמודה בשם address;
+    # ועמודות lat/lon של הקלט עצמו לא מתבלבלות עם עמודות הפלט
+    src, out1, out2 = tmp_path / "in.csv", tmp_path / "out1.csv", tmp_path / "out2.csv"
+    src.write_text("name,address,lat,lon\nTel Aviv,x,1.5,2.5\nHaifa,y,3.5,4.5\n", encoding="utf-8")
+    geocode_csv(str(src), str(out1), locator=_locator([]))
+
+    calls: list[str] = []
+    summary = geocode_csv(str(src), str(out2), locator=_locator(calls), previous_path=str(out1))
+
+    assert calls == []
+    assert summary is not None
+    assert (summary.changed, summary.unchanged, summary.reused) == (0, 2, 2)
+    assert out2.read_text(encoding="utf-8") == out1.read_text(encoding="utf-8")
@@ -0,0 +1,67 @@
+import pytest
+
+from itur.ratecontrol import AdaptiveRateController, rate_controller, rate_snapshot
+
+
+class GeocoderRateLimited(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("429")
+        self.retry_after = retry_after
+
+
+class GeocoderTimedOut(Exception):
+    pass
+
+
+def test_aimd_grows_on_success_and_halves_on_throttle() -> None:
+    controller = AdaptiveRateController("t", initial_rate=4.0, max_rate=10.0, increase=0.5)
+    for _ in range(20):
+        controller.on_success(0.01)
+    grown = controller.rate
+    assert 4.0 < grown <= 10.0
+    controller.on_throttle()
+    assert controller.rate == pytest.approx(grown / 2)
+    # חסימה נוספת מיד אחרי — אותו אירוע, לא מכווצים שוב
+    controller.on_throttle()
+    assert controller.rate == pytest.approx(grown / 2)
+    assert controller.snapshot()["throttles"] == 2
+
+
+def test_slow_provider_lowers_rate() -> None:
+    controller = AdaptiveRateController("t", initial_rate=4.0, target_latency=0.5)
+    controller.on_success(2.0)
+    assert controller.rate < 4.0
+
+
+def test_call_retries_throttled_and_transient_errors() -> None:
+    controller = AdaptiveRateController("t", initial_rate=50.0, max_rate=50.0)
+    errors = [GeocoderRateLimited(), GeocoderTimedOut()]
+
+    def flaky(x):
+        if errors:
+            raise errors.pop(0)
+        return x * 2
+
+    assert controller.call(flaky, 21) == 42
+    snap = controller.snapshot()
+    assert (snap["throttles"], snap["errors"], snap["successes"]) == (1, 1, 1)
+    assert controller.rate < 50.0
+
+
+def test_call_raises_other_errors_without_retry() -> None:
+    controller = AdaptiveRateController("t", initial_rate=50.0)
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise KeyError("bad")
+
+    with pytest.raises(KeyError):
+        controller.call(broken)
+    assert len(calls) == 1
+
+
+def test_controllers_are_shared_per_provider() -> None:
+    first = rate_controller("test-shared", initial_rate=3.0)
+    assert rate_controller("test-shared", initial_rate=9.0) is first
+    assert rate_snapshot()["test-shared"]["rate"] == 3.0
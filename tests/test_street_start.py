@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from itur.geocode import StreetStartStore, _default_locator, _street_start
+
+
+def test_street_start_from_geojson() -> None:
+    line = {"type": "LineString", "coordinates": [[34.78, 32.08], [34.79, 32.09]]}
+    multi = {"type": "MultiLineString", "coordinates": [[[34.70, 31.90], [34.71, 31.91]]]}
+    assert _street_start(line) == (32.08, 34.78)
+    assert _street_start(multi) == (31.90, 34.70)
+    assert _street_start({"type": "Point", "coordinates": [34.0, 32.0]}) is None
+    assert _street_start(None) is None
+
+
+def test_street_store_persists(tmp_path: Path) -> None:
+    path = tmp_path / "streets.sqlite3"
+    store = StreetStartStore(path)
+    store.put("רחובות", "הרצל", (31.89, 34.81))
+
+    reloaded = StreetStartStore(path)
+    assert reloaded.get(" רחובות ", "הרצל") == (31.89, 34.81)
+    assert reloaded.get("רחובות", "ביאליק") is None
+    assert len(reloaded) == 1
+
+
+def test_street_store_shared_between_writers(tmp_path: Path) -> None:
+    path = tmp_path / "streets.sqlite3"
+    first, second = StreetStartStore(path), StreetStartStore(path)
+    first.put("רחובות", "הרצל", (31.89, 34.81))
+    second.put("רחובות", "ביאליק", (31.90, 34.80))
+    second.put("רחובות", "הרצל", (0.0, 0.0))
+
+    assert second.get("רחובות", "הרצל") == (31.89, 34.81)
+    assert StreetStartStore(path).get("רחובות", "הרצל") == (31.89, 34.81)
+    assert first.get("רחובות", "ביאליק") == (31.90, 34.80)
+    assert len(StreetStartStore(path)) == 2
+
+
+def test_street_store_ignores_corrupt_file(tmp_path: Path) -> None:
+    path = tmp_path / "streets.sqlite3"
+    path.write_text("[1, 2]", encoding="utf-8")
+    store = StreetStartStore(path)
+    assert store.get("רחובות", "הרצל") is None
+    store.put("רחובות", "הרצל", (31.89, 34.81))
+    assert store.get("רחובות", "הרצל") == (31.89, 34.81)
+
+
+def test_locator_uses_street_store_without_fetching() -> None:
+    store = StreetStartStore()
+    store.put("רחובות", "הרצל", (31.89, 34.81))
+    locate = _default_locator(street_store=store)
+    assert locate("הרצל, רחובות") == (31.89, 34.81)
@@ -0,0 +1,159 @@
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("multipart")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from itur import webapp  # noqa: E402
+
+
+def _fake_locator(addr: str):
+    if addr == "Tel Aviv":
+        return (32.0853, 34.7818)
+    return None
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setattr(webapp, "UPLOAD_DIR", tmp_path / "uploads")
+    monkeypatch.setattr(webapp, "_shared_locator", lambda: _fake_locator)
+    monkeypatch.setattr(webapp, "admission", webapp.AdmissionController())
+    return TestClient(webapp.app)
+
+
+def test_geocode_preview_and_download(client: TestClient) -> None:
+    body = "address,name\nTel Aviv,a\nJerusalem,b\n" + "Haifa,c\n" * 150
+    resp = client.post(
+        "/geocode",
+        files={"file": ("in.csv", body.encode("utf-8"), "text/csv")},
+        data={"address_column": "address", "delimiter": ","},
+    )
+    assert resp.status_code == 200
+    assert "זוהו 152 שורות" in resp.text
+    assert resp.text.count("<tr>") == 1 + webapp.PREVIEW_ROWS
+    assert "raw_text" not in resp.text
+
+    upload_id = resp.text.split('name="upload_id" value="')[1].split('"')[0]
+    download = client.post(
+        "/download",
+        data={"upload_id": upload_id, "delimiter": ",", "address_column": "address", "has_header": "true"},
+    )
+    lines = download.text.strip().splitlines()
+    assert lines[0] == "address,name,lat,lon"
+    assert lines[1] == "Tel Aviv,a,32.0853,34.7818"
+    assert lines[2] == "Jerusalem,b,,"
+    assert len(lines) == 153
+    assert webapp.admission.snapshot()["active_jobs"] == 0
+
+
+def test_download_rejects_unknown_upload(client: TestClient) -> None:
+    resp = client.post("/download", data={"upload_id": "../../etc/passwd"})
+    assert resp.status_code == 404
+
+
+def _ndjson_lines(text: str) -> list[dict]:
+    import json
+
+    return [json.loads(line) for line in text.splitlines() if line]
+
+
+def test_api_geocode_json_array(client: TestClient) -> None:
+    resp = client.post("/api/geocode", json=["Tel Aviv", {"id": "r2", "address": "Jerusalem"}, 5])
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = _ndjson_lines(resp.text)
+    assert [line["id"] for line in lines] == [0, "r2", 2]
+    assert lines[0]["status"] == "ok" and lines[0]["lat"] == 32.0853
+    assert lines[0]["lat_ddm"] == "32° 05.118' N"
+    assert lines[1]["status"] == "not_found" and lines[1]["lat"] is None
+    assert lines[2]["status"] == "invalid"
+
+
+def test_api_geocode_ndjson_stream(client: TestClient) -> None:
+    def body():
+        yield b'{"id": 1, "address": "Tel '
+        yield 'Aviv"}\n"Jerusa'.encode("utf-8")
+        yield b'lem"\n'
+
+    resp = client.post("/api/geocode", content=body(), headers={"content-type": "application/x-ndjson"})
+    lines = _ndjson_lines(resp.text)
+    assert [(line["id"], line["status"]) for line in lines] == [(1, "ok"), (1, "not_found")]
+
+
+def test_api_geocode_reports_bad_json(client: TestClient) -> None:
+    resp = client.post("/api/geocode", content=b'"Tel Aviv"\n{oops}\n')
+    lines = _ndjson_lines(resp.text)
+    assert lines[0]["status"] == "ok"
+    assert lines[-1]["status"] == "error"
+
+
+def test_api_geocode_accepts_bom(client: TestClient) -> None:
+    resp = client.post("/api/geocode", content='\ufeff["Tel Aviv"]'.encode("utf-8"))
+    assert [line["status"] for line in _ndjson_lines(resp.text)] == ["ok"]
+
+
+@pytest.mark.parametrize("body", [b'[,,"Tel Aviv",,]', b'["Tel Aviv",]', b'"Tel Aviv" "Jerusalem"\n'])
+def test_api_geocode_rejects_bad_separators(client: TestClient, body: bytes) -> None:
+    lines = _ndjson_lines(client.post("/api/geocode", content=body).text)
+    assert lines[-1]["status"] == "error"
+    assert all(line["status"] != "not_found" for line in lines)
+
+
+def test_geocode_rejects_oversized_upload(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(webapp, "MAX_UPLOAD_BYTES", 16)
+    resp = client.post("/geocode", files={"file": ("in.csv", b"address\n" + b"Tel Aviv\n" * 10, "text/csv")})
+    assert resp.status_code == 413
+    assert not list(webapp.UPLOAD_DIR.glob("*.csv"))
+
+
+def test_index_page(client: TestClient) -> None:
+    resp = client.get("/")
+    assert resp.status_code == 200
+    assert 'action="/geocode"' in resp.text
+
+
+def test_per_client_job_limit_returns_429(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    from itur.admission import AdmissionController
+
+    controller = AdmissionController(max_jobs=4, max_jobs_per_client=1)
+    monkeypatch.setattr(webapp, "admission", controller)
+    held = controller.admit("testclient")
+
+    resp = client.post("/api/geocode", json=["Tel Aviv"])
+    assert resp.status_code == 429
+    assert resp.headers["retry-after"]
+    assert resp.json()["detail"]["queue_position"] == 1
+
+    held.release()
+    resp = client.post("/api/geocode", json=["Tel Aviv"])
+    assert resp.status_code == 200
+    assert controller.snapshot()["active_jobs"] == 0
+
+
+def test_client_id_ignores_spoofed_forwarded_for(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    from itur.admission import AdmissionController
+
+    controller = AdmissionController(max_jobs=4, max_jobs_per_client=1)
+    monkeypatch.setattr(webapp, "admission", controller)
+    held = controller.admit("testclient")
+    resp = client.post("/api/geocode", json=["Tel Aviv"], headers={"X-Forwarded-For": "9.9.9.9"})
+    assert resp.status_code == 429
+    held.release()
+
+    # מאחורי פרוקסי מהימן אחד: הערך הימני הוא הלקוח, וערכים משמאלו לא משנים
+    monkeypatch.setattr(webapp, "TRUSTED_PROXY_HOPS", 1)
+    held = controller.admit("1.2.3.4")
+    resp = client.post("/api/geocode", json=["Tel Aviv"], headers={"X-Forwarded-For": "9.9.9.9, 1.2.3.4"})
+    assert resp.status_code == 429
+    held.release()
+
+
+def test_status_reports_admission_and_provider_rates(client: TestClient) -> None:
+    from itur.ratecontrol import rate_controller
+
+    rate_controller("test-status", initial_rate=2.0)
+    body = client.get("/api/status").json()
+    assert body["admission"]["active_jobs"] == 0
+    assert body["providers"]["test-status"]["rate"] == 2.0